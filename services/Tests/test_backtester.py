@@ -0,0 +1,86 @@
+# test_backtester.py
+# The vectorized backtest must reproduce the bar-by-bar replay exactly.
+import os
+import sys
+import unittest
+from pathlib import Path
+
+# Add parent directory to path so we can import the services modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+# config.py builds the Alpaca clients at import; these tests never call them
+os.environ.setdefault("ALPACA_API_KEY", "test")
+os.environ.setdefault("ALPACA_SECRET_KEY", "test")
+
+import numpy as np
+import pandas as pd
+
+from config import SPECIALISTS
+from backtester import Backtester, new_agent_stats
+from build_dataset import compute_features
+from ml_ensemble import EnsembleCoordinator
+from ml_specialist import Specialist
+
+
+class FixedVote:
+    """News/twitter agent double: the same vote for every bar, no network"""
+
+    def __init__(self, name, signal, confidence):
+        self.vote = {'specialist': name, 'signal': signal, 'confidence': confidence, 'rationale': 'fixed'}
+
+    def predict(self, symbols=None):
+        return dict(self.vote)
+
+
+def make_features(n=220, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    bars = pd.DataFrame({
+        'Open': close, 'High': close * 1.002, 'Low': close * 0.998, 'Close': close,
+        'Volume': rng.integers(100, 10_000, n).astype(float),
+    }, index=pd.date_range("2026-01-05 09:30", periods=n, freq="min", tz="US/Eastern"))
+    return compute_features(bars)
+
+
+def make_backtester(df):
+    """Backtester over specialists trained in memory on df (no model files, no live agents)"""
+    target = (df['Close'].shift(-3) > df['Close']).astype(int)
+    ensemble = EnsembleCoordinator.__new__(EnsembleCoordinator)
+    ensemble.news_agent = FixedVote('news_catalyst', 1, 0.5)
+    ensemble.twitter_agent = FixedVote('twitter_sentiment', 0, 0.3)
+    ensemble.sentiment_refresher = None
+    ensemble.specialists = {}
+    for name, cfg in SPECIALISTS.items():
+        if cfg['type'] == 'ml':
+            spec = Specialist(name, dict(cfg, model_type='random_forest'), load_model=False)
+            spec.fit(df.assign(Target=target), test_size=None)
+            ensemble.specialists[name] = spec
+        elif cfg['type'] == 'news':
+            ensemble.specialists[name] = ensemble.news_agent
+        else:
+            ensemble.specialists[name] = ensemble.twitter_agent
+    backtester = Backtester.__new__(Backtester)
+    backtester.ensemble = ensemble
+    backtester.agent_stats = new_agent_stats()
+    return backtester
+
+
+class TestVectorizedParity(unittest.TestCase):
+    def test_matches_bar_by_bar(self):
+        df = make_features()
+        backtester = make_backtester(df)
+        bar_stats, vec_stats = new_agent_stats(), new_agent_stats()
+        bar_trades, bar_curve, bar_equity = backtester._run_bar_by_bar('TEST', df, bar_stats)
+        vec_trades, vec_curve, vec_equity = backtester._run_vectorized('TEST', df, vec_stats)
+
+        self.assertGreater(len(bar_trades), 0)
+        self.assertEqual(bar_trades, vec_trades)
+        self.assertEqual(bar_curve, vec_curve)
+        self.assertEqual(bar_equity, vec_equity)
+        for name in SPECIALISTS:
+            self.assertEqual(bar_stats[name]['total'], vec_stats[name]['total'], name)
+            self.assertEqual(bar_stats[name]['correct'], vec_stats[name]['correct'], name)
+            self.assertAlmostEqual(bar_stats[name]['pnl_contrib'], vec_stats[name]['pnl_contrib'], places=6, msg=name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+# test_feature_engine.py
+# The streaming engine must reproduce compute_features bar for bar.
+import os
+import sys
+import unittest
+from pathlib import Path
+
+# Add parent directory to path so we can import the services modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+# config.py builds the Alpaca clients at import; these tests never call them
+os.environ.setdefault("ALPACA_API_KEY", "test")
+os.environ.setdefault("ALPACA_SECRET_KEY", "test")
+
+import numpy as np
+import pandas as pd
+
+from config import TALIB_AVAILABLE
+from build_dataset import compute_features
+from feature_engine import FEATURE_COLUMNS, IncrementalFeatureEngine
+
+
+def make_bars(n=300, seed=0, flat_from=None, flat_price=320.30):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    if flat_from is not None:
+        close[flat_from:] = flat_price
+    return pd.DataFrame({
+        'Open': close,
+        'High': close * (1 + rng.uniform(0, 0.002, n)),
+        'Low': close * (1 - rng.uniform(0, 0.002, n)),
+        'Close': close,
+        'Volume': rng.integers(1_000, 50_000, n).astype(float),
+    }, index=pd.date_range("2026-01-05 09:30", periods=n, freq="min", tz="US/Eastern"))
+
+
+def stream(bars):
+    engine = IncrementalFeatureEngine(use_talib=TALIB_AVAILABLE)
+    return pd.DataFrame([engine.update(bar) for bar in bars.to_dict('records')], index=bars.index)
+
+
+class TestFeatureParity(unittest.TestCase):
+    def assert_matches_batch(self, bars):
+        batch = compute_features(bars.copy())
+        streamed = stream(bars)
+        for column in FEATURE_COLUMNS:
+            np.testing.assert_allclose(streamed[column].astype(float), batch[column].astype(float),
+                                       rtol=1e-9, atol=1e-9, err_msg=column)
+
+    def test_random_walk(self):
+        self.assert_matches_batch(make_bars())
+
+    def test_flat_price_window(self):
+        # 320.30 is not exactly representable: the window mean is one ulp off the price
+        self.assert_matches_batch(make_bars(flat_from=250))
+
+    def test_flat_window_is_finite(self):
+        streamed = stream(make_bars(n=60, flat_from=0))
+        values = streamed[[c for c in FEATURE_COLUMNS if c != 'MACD_Cross_Up']].to_numpy(dtype=float)
+        self.assertTrue(np.isfinite(values).all())
+        self.assertTrue((streamed['ZScore'] == 0).all())
+        self.assertTrue((streamed['Volatility_Ratio'] == 0).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+# test_trade_logger.py
+# Journal, order index and rollups must stay consistent when several writers share the logs.
+import json
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path so we can import the services modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+# config.py builds the Alpaca clients at import; these tests never call them
+os.environ.setdefault("ALPACA_API_KEY", "test")
+os.environ.setdefault("ALPACA_SECRET_KEY", "test")
+
+import trade_logger as trade_logger_module
+from trade_journal import TradeJournal
+from trade_logger import TradeLogger
+
+
+def make_trade(order_id, pnl=None):
+    trade = {'symbol': 'AAPL', 'side': 'BUY', 'qty': 10, 'entry_price': 100.0, 'order_id': order_id, 'status': 'OPEN'}
+    if pnl is not None:
+        trade.update(status='CLOSED', pnl_amount=pnl)
+    return trade
+
+
+class TwoWritersTest(unittest.TestCase):
+    """Two TradeLoggers over the same log directory, as when the GUI and the trader each had one"""
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        patcher = mock.patch.multiple(
+            trade_logger_module,
+            LOGS_DIR=self.root,
+            STRATEGY_LOGS_DIR=self.root / "strategies",
+            ORDER_INDEX_PATH=self.root / "order_index.jsonl",
+            ROLLUPS_DIR=self.root / "rollups",
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.writers = [self.make_logger(), self.make_logger()]
+        for writer in self.writers:
+            self.addCleanup(writer.journal.close)
+
+    def make_logger(self):
+        return TradeLogger(journal=TradeJournal(lock_path=self.root / "trades.lock"), backend='journal')
+
+    def log_interleaved(self, ids):
+        for i, order_id in enumerate(ids):
+            self.assertTrue(self.writers[i % 2].log_trade(make_trade(order_id)))
+
+
+class TestJournalIndex(TwoWritersTest):
+    def test_interleaved_lookups(self):
+        ids = ['a', 'b', 'c', 'd', 'e']
+        self.log_interleaved(ids)
+        for writer in self.writers:
+            for order_id in ids:
+                self.assertEqual(writer.get_trade(order_id)['order_id'], order_id)
+
+    def test_update_from_other_writer(self):
+        self.log_interleaved(['a', 'b', 'c'])
+        self.assertTrue(self.writers[1].update_trade('a', {'status': 'CLOSED', 'exit_price': 101.0}))
+        self.writers[0].log_trade(make_trade('d'))
+        for writer in self.writers:
+            self.assertEqual(writer.get_trade('a')['exit_price'], 101.0)
+            self.assertEqual(writer.get_trade('b')['status'], 'OPEN')
+            self.assertEqual(writer.get_trade('d')['order_id'], 'd')
+
+    def test_repeated_id_updates_newest(self):
+        self.log_interleaved(['a', 'a'])
+        self.writers[1].update_trade('a', {'status': 'CLOSED'})
+        trades = self.writers[0].get_daily_trades()['trades']
+        self.assertEqual([t['status'] for t in trades], ['OPEN', 'CLOSED'])
+        self.assertEqual(self.writers[0].get_trade('a')['status'], 'CLOSED')
+
+    def test_lookups_after_compaction(self):
+        self.log_interleaved(['a', 'b', 'c'])
+        self.writers[0].update_trade('b', {'status': 'CLOSED'})
+        self.writers[1].compact()
+        self.log_interleaved(['d', 'e'])
+        self.writers[0].update_trade('e', {'status': 'CLOSED'})
+        for writer in self.writers:
+            self.assertEqual([writer.get_trade(i)['order_id'] for i in 'abcde'], list('abcde'))
+            self.assertEqual(writer.get_trade('b')['status'], 'CLOSED')
+            self.assertEqual(writer.get_trade('e')['status'], 'CLOSED')
+        trades = self.writers[0].get_daily_trades()['trades']
+        self.assertEqual([t['order_id'] for t in trades], list('abcde'))
+
+
+class TestCompaction(TwoWritersTest):
+    def test_day_rollover_compacts_previous_day(self):
+        today = self.writers[0].today
+        yesterday = today - timedelta(days=1)
+        with mock.patch.object(TradeLogger, '_check_day'):   # both writers still on yesterday's logs
+            for writer in self.writers:
+                writer.today = yesterday
+            self.log_interleaved(['a', 'b'])
+            self.writers[0].update_trade('a', {'status': 'CLOSED', 'pnl_amount': 2.0})
+        journal = self.root / self.writers[0].get_log_filename(yesterday)
+        self.assertIn('"update"', journal.read_text())
+
+        self.writers[1].log_trade(make_trade('c'))   # first write after midnight
+        self.assertEqual(self.writers[1].today, today)
+        self.assertNotIn('"update"', journal.read_text())
+        self.assertIn(str(yesterday), json.loads((self.root / "compaction.json").read_text()))
+        for writer in self.writers + [self.make_logger()]:
+            self.assertEqual(writer.get_trade('a')['pnl_amount'], 2.0)
+            self.assertEqual(writer.get_trade('b')['status'], 'OPEN')
+            self.assertEqual(writer.get_trade('c')['order_id'], 'c')
+
+
+class TestRollups(TwoWritersTest):
+    def raw_stats(self):
+        trades = self.writers[0].get_daily_trades()['trades']
+        closed = [t for t in trades if t['status'] == 'CLOSED']
+        return len(trades), len(closed), round(sum(t['pnl_amount'] for t in closed), 2)
+
+    def assert_consistent(self):
+        total, closed, pnl = self.raw_stats()
+        for writer in self.writers:
+            stats = writer.get_daily_statistics()
+            self.assertEqual((stats['total_trades'], stats['closed_trades'], stats['total_pnl']), (total, closed, pnl))
+        on_disk = json.loads((self.root / "rollups" / f"{self.writers[0].today}.json").read_text())['all']
+        self.assertEqual((on_disk['total_trades'], on_disk['closed_trades'], round(on_disk['total_pnl'], 2)), (total, closed, pnl))
+
+    def test_interleaved_writes(self):
+        self.writers[0].get_daily_statistics()   # both writers cache the day before any trades
+        self.writers[1].get_daily_statistics()
+        for i, pnl in enumerate([2.0, 100.0, -5.0, 7.5, 0.25]):
+            self.writers[i % 2].log_trade(make_trade(f"t{i}", pnl))
+        self.assert_consistent()
+        self.assertEqual(self.writers[0].get_daily_statistics()['total_pnl'], 104.75)
+
+    def test_updates_from_both_writers(self):
+        self.log_interleaved(['a', 'b', 'c', 'd'])
+        self.writers[0].get_daily_statistics()
+        self.writers[1].update_trade('a', {'status': 'CLOSED', 'pnl_amount': 3.0})
+        self.writers[0].update_trade('b', {'status': 'CLOSED', 'pnl_amount': -1.0})
+        self.writers[1].update_trade('a', {'pnl_amount': 4.0})
+        self.writers[0].log_trade(make_trade('e', 10.0))
+        self.assert_consistent()
+        self.assertEqual(self.writers[1].get_daily_statistics()['best_trade']['order_id'], 'e')
+
+
+    def test_strategy_routing(self):
+        self.writers[0].log_trade(dict(make_trade('s', 5.0), strategy='scalping'), strategy='macd_crossover')
+        stats = self.writers[1].get_daily_statistics()['by_strategy']
+        self.assertEqual(list(stats), ['scalping'])
+        trades = self.writers[1].get_strategy_daily_trades('scalping')['trades']
+        self.assertEqual([t['order_id'] for t in trades], ['s'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,95 +2,289 @@
 from config import *
 from ml_ensemble import EnsembleCoordinator
 from ml_specialist import Specialist
-from build_dataset import add_features_and_target, download_intraday
+from build_dataset import compute_features, download_intraday
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+RESULTS_DIR = "models/backtest_results"
+
+
+def simulate_trades(index, close, recommend_buy, actual_return, start=50, stop_loss_pct=STOP_LOSS_PCT,
+                    final_price=None, take_profit_pct=None):
+    """
+    Replay the backtest trade logic over precomputed arrays.
+    recommend_buy[i] / actual_return[i] are for bar i; bars before `start` are skipped.
+    With take_profit_pct set, a position is also closed once price is that far above entry.
+    A position still open at the end is marked at final_price (default: the last close).
+    Returns (trades, equity_curve, final_equity) exactly as the bar-by-bar loop produces them.
+    """
+    close = np.asarray(close, dtype=float).tolist()
+    recommend_buy = np.asarray(recommend_buy, dtype=bool).tolist()
+    actual_return = np.asarray(actual_return, dtype=float).tolist()
+
+    equity = 100_000.0
+    position = 0
+    entry_price = 0
+    equity_curve = [equity]
+    trades = []
+    for i in range(start, len(actual_return)):
+        price = close[i]
+        if recommend_buy[i] and position == 0:
+            position = int(equity * (POSITION_SIZE_PCT / 100.0) / price)
+            entry_price = price
+            trades.append({'entry_time': index[i], 'entry_price': entry_price, 'qty': position})
+        elif position > 0 and (not recommend_buy[i] or actual_return[i] < -stop_loss_pct
+                               or (take_profit_pct is not None and price / entry_price - 1 >= take_profit_pct)):
+            pnl = position * (price - entry_price)
+            equity += pnl
+            equity_curve.append(equity)
+            trades[-1].update({'exit_time': index[i], 'exit_price': price, 'pnl': pnl})
+            position = 0
+        else:
+            equity_curve.append(equity)
+
+    if position > 0:
+        pnl = position * ((close[-1] if final_price is None else final_price) - entry_price)
+        equity += pnl
+    return trades, equity_curve, equity
+
+
+def new_agent_stats():
+    return {name: {'correct': 0, 'total': 0, 'pnl_contrib': 0.0} for name in SPECIALISTS}
+
+
+def merge_agent_stats(stats_list):
+    merged = new_agent_stats()
+    for stats in stats_list:
+        for name, s in stats.items():
+            merged[name]['correct'] += s['correct']
+            merged[name]['total'] += s['total']
+            merged[name]['pnl_contrib'] += s['pnl_contrib']
+    return merged
+
 
 class Backtester:
     def __init__(self):
         self.ensemble = EnsembleCoordinator()
-        self.agent_stats = {name: {'correct': 0, 'total': 0, 'pnl_contrib': 0.0} for name in SPECIALISTS}
+        self.agent_stats = new_agent_stats()
 
-    def run_backtest(self, symbols=None):
+    def run_backtest(self, symbols=None, mode='vectorized'):
+        """Backtest each symbol; mode='vectorized' (one predict_proba per specialist) or 'bar' (bar-by-bar replay)"""
         if symbols is None:
             symbols = ["SPY"]
+        results = []
         for symbol in symbols:
-            logger.info(f"\n🚀 Running backtest on {symbol}...")
-            df = download_intraday(symbol, strategy='macd_crossover')
-            if df is None or len(df) < 100:
+            result = self.backtest_symbol(symbol, mode)
+            if result is None:
                 continue
-            df = add_features_and_target(df)
+            report_result(result)
+            results.append(result)
+        self.agent_stats = merge_agent_stats(r['agent_stats'] for r in results)
+        return results
 
-            equity = 100_000.0
-            position = 0
-            entry_price = 0
-            equity_curve = [equity]
-            trades = []
-
-            for i in range(50, len(df) - LOOKAHEAD_BARS):
-                current_df = df.iloc[:i+1].copy()
-                result = self.ensemble.predict(current_df, symbol)
-
-                # Show News Catalyst vote explicitly
-                news_vote = self.ensemble.news_agent.predict([symbol])
-                logger.info(f"  News Catalyst → Signal: {news_vote['signal']} | Conf: {news_vote['confidence']:.1%} | {news_vote['rationale']}")
-
-                price = current_df['Close'].iloc[-1]
-                future_price = df['Close'].iloc[i + LOOKAHEAD_BARS]
-                actual_return = (future_price / price) - 1
-                actual_signal = 1 if actual_return > PROFIT_THRESHOLD * 0.5 else 0
-
-                for name, agent in self.ensemble.specialists.items():
-                    if isinstance(agent, Specialist):
-                        pred = agent.predict(current_df)
-                        self.agent_stats[name]['total'] += 1
-                        if pred['signal'] == actual_signal:
-                            self.agent_stats[name]['correct'] += 1
-                        self.agent_stats[name]['pnl_contrib'] += pred['confidence'] * actual_return * 5000
-
-                # Trade logic
-                if result['recommendation'] == "BUY" and position == 0:
-                    position = int(equity * (POSITION_SIZE_PCT / 100.0) / price)
-                    entry_price = price
-                    trades.append({'entry_time': current_df.index[-1], 'entry_price': entry_price, 'qty': position})
-                elif position > 0 and (result['recommendation'] == "HOLD" or actual_return < -STOP_LOSS_PCT):
-                    pnl = position * (price - entry_price)
-                    equity += pnl
-                    equity_curve.append(equity)
-                    trades[-1].update({'exit_time': current_df.index[-1], 'exit_price': price, 'pnl': pnl})
-                    position = 0
-                else:
-                    equity_curve.append(equity)
-
-            if position > 0:
-                pnl = position * (df['Close'].iloc[-1] - entry_price)
+    def backtest_symbol(self, symbol, mode='vectorized'):
+        """Backtest one symbol with its own agent stats; returns a picklable result dict (None if no data)"""
+        logger.info(f"\n🚀 Running {mode} backtest on {symbol}...")
+        df = download_intraday(symbol, strategy='macd_crossover')
+        if df is None or len(df) < 100:
+            return None
+        df = compute_features(df)
+        agent_stats = new_agent_stats()
+        if mode == 'bar':
+            trades, equity_curve, equity = self._run_bar_by_bar(symbol, df, agent_stats)
+        else:
+            trades, equity_curve, equity = self._run_vectorized(symbol, df, agent_stats)
+        return {'symbol': symbol, 'trades': trades, 'equity_curve': equity_curve, 'equity': equity, 'agent_stats': agent_stats}
+
+    def _run_bar_by_bar(self, symbol, df, agent_stats):
+        equity = 100_000.0
+        position = 0
+        entry_price = 0
+        equity_curve = [equity]
+        trades = []
+
+        for i in range(50, len(df) - LOOKAHEAD_BARS):
+            current_df = df.iloc[:i+1].copy()
+            result = self.ensemble.predict(current_df, symbol)
+
+            # Show News Catalyst vote explicitly
+            news_vote = self.ensemble.news_agent.predict([symbol])
+            logger.info(f"  News Catalyst → Signal: {news_vote['signal']} | Conf: {news_vote['confidence']:.1%} | {news_vote['rationale']}")
+
+            price = current_df['Close'].iloc[-1]
+            future_price = df['Close'].iloc[i + LOOKAHEAD_BARS]
+            actual_return = (future_price / price) - 1
+            actual_signal = 1 if actual_return > PROFIT_THRESHOLD * 0.5 else 0
+
+            for name, agent in self.ensemble.specialists.items():
+                if isinstance(agent, Specialist):
+                    pred = agent.predict(current_df)
+                    agent_stats[name]['total'] += 1
+                    if pred['signal'] == actual_signal:
+                        agent_stats[name]['correct'] += 1
+                    agent_stats[name]['pnl_contrib'] += pred['confidence'] * actual_return * 5000
+
+            # Trade logic
+            if result['recommendation'] == "BUY" and position == 0:
+                position = int(equity * (POSITION_SIZE_PCT / 100.0) / price)
+                entry_price = price
+                trades.append({'entry_time': current_df.index[-1], 'entry_price': entry_price, 'qty': position})
+            elif position > 0 and (result['recommendation'] == "HOLD" or actual_return < -STOP_LOSS_PCT):
+                pnl = position * (price - entry_price)
                 equity += pnl
+                equity_curve.append(equity)
+                trades[-1].update({'exit_time': current_df.index[-1], 'exit_price': price, 'pnl': pnl})
+                position = 0
+            else:
+                equity_curve.append(equity)
+
+        if position > 0:
+            pnl = position * (df['Close'].iloc[-1] - entry_price)
+            equity += pnl
+        return trades, equity_curve, equity
+
+    def _run_vectorized(self, symbol, df, agent_stats):
+        """
+        Same results as _run_bar_by_bar without the O(n²) copies: every specialist scores
+        all rows in one predict_proba call and the trade loop runs over plain arrays.
+        News/twitter votes are live-only signals, so they are fetched once and applied
+        to every bar (the bar path gets the same cached value within the news TTL).
+        """
+        n = len(df) - LOOKAHEAD_BARS
+        close = df['Close'].to_numpy(dtype=float)
+        actual_return = close[LOOKAHEAD_BARS:] / close[:n] - 1
+        actual_signal = (actual_return > PROFIT_THRESHOLD * 0.5).astype(int)
+        rows = df.iloc[:n]
+
+        signals = np.zeros((n, len(self.ensemble.specialists)), dtype=int)
+        confs = np.zeros((n, len(self.ensemble.specialists)))
+        for j, (name, agent) in enumerate(self.ensemble.specialists.items()):
+            if isinstance(agent, Specialist):
+                signals[:, j], confs[:, j] = agent.predict_arrays(rows)
+                scored = slice(50, n)
+                stats = agent_stats[name]
+                stats['total'] += max(0, n - 50)
+                stats['correct'] += int((signals[scored, j] == actual_signal[scored]).sum())
+                contrib = confs[scored, j] * actual_return[scored] * 5000
+                stats['pnl_contrib'] += float(contrib.sum())
+            else:
+                pred = self.ensemble.external_vote(name, symbol)
+                signals[:, j] = pred['signal']
+                confs[:, j] = pred['confidence']
+
+        _, _, recommend_buy = EnsembleCoordinator.combine_arrays(signals, confs)
+        return simulate_trades(rows.index, close[:n], recommend_buy, actual_return, final_price=close[-1])
+
+
+def report_result(result):
+    """Log one symbol's summary and write its trades CSV and equity curve PNG"""
+    symbol, trades, equity_curve, equity = result['symbol'], result['trades'], result['equity_curve'], result['equity']
+    win_rate = len([t for t in trades if t.get('pnl', 0) > 0]) / len(trades) * 100 if trades else 0
+    total_pnl = equity - 100_000
+
+    logger.info(f"\n{'='*70}")
+    logger.info(f"BACKTEST COMPLETE — {symbol}")
+    logger.info(f"Final Equity: ${equity:,.2f} | P&L: ${total_pnl:,.2f}")
+    logger.info(f"Win Rate: {win_rate:.1f}% | Trades: {len(trades)}")
+    logger.info(f"{'='*70}")
+
+    print_agent_stats(result['agent_stats'])
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    pd.DataFrame(trades).to_csv(f"{RESULTS_DIR}/{symbol}_trades.csv", index=False)
+    plt.figure(figsize=(12,6))
+    plt.plot(equity_curve, label='Equity', color='blue')
+    plt.title(f'Equity Curve — {symbol}')
+    plt.legend()
+    plt.grid(True)
+    plt.savefig(f"{RESULTS_DIR}/{symbol}_equity_curve.png")
+    plt.close()
+
+
+def print_agent_stats(agent_stats):
+    print("\n📊 AGENT PERFORMANCE")
+    for name, stats in agent_stats.items():
+        acc = stats['correct'] / stats['total'] * 100 if stats['total'] > 0 else 0
+        print(f"  {SPECIALISTS[name]['name']:22} | Accuracy: {acc:5.1f}% | P&L contrib: ${stats['pnl_contrib']:,.0f}")
+
+
+# Parallel multi-symbol runner: one Backtester (models loaded once) per worker process
+_worker_backtester = None
+
+
+def _init_worker():
+    global _worker_backtester
+    _worker_backtester = Backtester()
+
+
+def _backtest_worker(symbol, mode):
+    return _worker_backtester.backtest_symbol(symbol, mode)
+
+
+def run_parallel_backtest(symbols, workers=None, mode='vectorized'):
+    """
+    Backtest each symbol in its own worker process and write an aggregate report:
+    all_trades.csv, equity_curves.csv, summary.csv and agent_stats.csv in RESULTS_DIR.
+    """
+    if not symbols:
+        logger.warning("No symbols to backtest")
+        return [], new_agent_stats()
+    workers = workers or os.cpu_count() or 1
+    results = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(symbols)), initializer=_init_worker) as pool:
+        futures = {pool.submit(_backtest_worker, symbol, mode): symbol for symbol in symbols}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Backtest failed for {futures[future]}: {e}")
+                continue
+            if result is not None:
+                report_result(result)
+                results.append(result)
+    results.sort(key=lambda r: symbols.index(r['symbol']))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    summary = []
+    all_trades = []
+    curves = []
+    for r in results:
+        trades = r['trades']
+        wins = len([t for t in trades if t.get('pnl', 0) > 0])
+        summary.append({
+            'symbol': r['symbol'],
+            'final_equity': r['equity'],
+            'pnl': r['equity'] - 100_000,
+            'trades': len(trades),
+            'win_rate': wins / len(trades) * 100 if trades else 0,
+        })
+        all_trades.extend(dict(t, symbol=r['symbol']) for t in trades)
+        curves.append(pd.DataFrame({'symbol': r['symbol'], 'step': range(len(r['equity_curve'])), 'equity': r['equity_curve']}))
+
+    agent_stats = merge_agent_stats(r['agent_stats'] for r in results)
+    pd.DataFrame(summary).to_csv(f"{RESULTS_DIR}/summary.csv", index=False)
+    pd.DataFrame(all_trades).to_csv(f"{RESULTS_DIR}/all_trades.csv", index=False)
+    if curves:
+        pd.concat(curves, ignore_index=True).to_csv(f"{RESULTS_DIR}/equity_curves.csv", index=False)
+    pd.DataFrame([
+        {'agent': name, 'correct': s['correct'], 'total': s['total'],
+         'accuracy': s['correct'] / s['total'] * 100 if s['total'] else 0, 'pnl_contrib': s['pnl_contrib']}
+        for name, s in agent_stats.items()
+    ]).to_csv(f"{RESULTS_DIR}/agent_stats.csv", index=False)
+
+    total_pnl = sum(row['pnl'] for row in summary)
+    logger.info(f"\n{'='*70}")
+    logger.info(f"PARALLEL BACKTEST COMPLETE — {len(results)}/{len(symbols)} symbols | Total P&L: ${total_pnl:,.2f}")
+    logger.info(f"{'='*70}")
+    print_agent_stats(agent_stats)
+    return results, agent_stats
 
-            win_rate = len([t for t in trades if t.get('pnl', 0) > 0]) / len(trades) * 100 if trades else 0
-            total_pnl = equity - 100_000
-
-            logger.info(f"\n{'='*70}")
-            logger.info(f"BACKTEST COMPLETE — {symbol}")
-            logger.info(f"Final Equity: ${equity:,.2f} | P&L: ${total_pnl:,.2f}")
-            logger.info(f"Win Rate: {win_rate:.1f}% | Trades: {len(trades)}")
-            logger.info(f"{'='*70}")
-
-            print("\n📊 AGENT PERFORMANCE")
-            for name, stats in self.agent_stats.items():
-                acc = stats['correct'] / stats['total'] * 100 if stats['total'] > 0 else 0
-                print(f"  {SPECIALISTS[name]['name']:22} | Accuracy: {acc:5.1f}% | P&L contrib: ${stats['pnl_contrib']:,.0f}")
-
-            os.makedirs("models/backtest_results", exist_ok=True)
-            pd.DataFrame(trades).to_csv(f"models/backtest_results/{symbol}_trades.csv", index=False)
-            plt.figure(figsize=(12,6))
-            plt.plot(equity_curve, label='Equity', color='blue')
-            plt.title(f'Equity Curve — {symbol}')
-            plt.legend()
-            plt.grid(True)
-            plt.savefig(f"models/backtest_results/{symbol}_equity_curve.png")
-            plt.close()
 
 if __name__ == "__main__":
-    bt = Backtester()
-    bt.run_backtest(symbols=["SPY"])
\ No newline at end of file
+    if len(sys.argv) > 1:
+        run_parallel_backtest(sys.argv[1:])
+    else:
+        bt = Backtester()
+        bt.run_backtest(symbols=["SPY"])
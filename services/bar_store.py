@@ -0,0 +1,245 @@
+# services/bar_store.py - ON-DISK BAR CACHE
+# Persistent per-symbol / per-timeframe bar store partitioned by trading day (Parquet).
+# Completed days are served from disk; only missing days (and today) hit Alpaca.
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import *
+from alpaca.data.requests import StockBarsRequest
+from alpaca.data.timeframe import TimeFrame
+from datetime import datetime, date, time as dtime, timedelta
+import threading
+import time
+
+BAR_COLUMNS = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume', 'timestamp': 'timestamp'}
+
+
+def bars_to_frame(bars):
+    """Normalise an Alpaca bars frame to the Open/High/Low/Close/Volume layout used by the features"""
+    df = bars.reset_index()
+    df = df.rename(columns=BAR_COLUMNS)
+    return df.set_index('timestamp')
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.astimezone(TIMEZONE).date() if value.tzinfo else value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+def _day_start(day):
+    return TIMEZONE.localize(datetime.combine(day, dtime.min))
+
+
+class BarStore:
+    """
+    Read-through cache for historical bars.
+    Layout: BAR_CACHE_DIR/<timeframe>/<symbol>/<YYYY-MM-DD>.parquet, one file per
+    ET trading day. Days with no bars (weekends, holidays) are stored as empty
+    files so a warm read never goes back to the network. Today is never cached
+    because it is still accumulating bars.
+    """
+
+    def __init__(self, root=BAR_CACHE_DIR, client=None):
+        self.root = Path(root)
+        self.client = client or data_client
+
+    def get_day_path(self, symbol, day, timeframe=TimeFrame.Minute):
+        """Get the partition file for one symbol/timeframe/day"""
+        return self.root / timeframe.value / symbol / f"{day.isoformat()}.parquet"
+
+    def get_bars(self, symbol, start, end=None, timeframe=TimeFrame.Minute):
+        """Return bars for symbol between start and end (inclusive days), fetching only uncached days"""
+        return self.get_bars_many([symbol], start, end, timeframe)[symbol]
+
+    def get_bars_many(self, symbols, start, end=None, timeframe=TimeFrame.Minute):
+        """
+        Return {symbol: bars} for every symbol between start and end (inclusive days).
+        Cached days are read from disk; uncached days are fetched for all symbols
+        that miss them with one multi-symbol request per contiguous day range.
+        """
+        today = datetime.now(TIMEZONE).date()
+        start_day = _as_date(start)
+        end_day = _as_date(end) if end is not None else today
+
+        frames = {symbol: [] for symbol in symbols}
+        missing = {}
+        current = start_day
+        while current <= end_day:
+            for symbol in symbols:
+                path = self.get_day_path(symbol, current, timeframe)
+                if current < today and path.exists():
+                    frames[symbol].append(pd.read_parquet(path))
+                else:
+                    missing.setdefault(current, set()).add(symbol)
+            current += timedelta(days=1)
+
+        for run_start, run_end in self._contiguous_runs(sorted(missing)):
+            run_symbols = set()
+            day = run_start
+            while day <= run_end:
+                run_symbols |= missing[day]
+                day += timedelta(days=1)
+            run_symbols = sorted(run_symbols)
+            logger.info(f"Fetching {timeframe.value} bars for {len(run_symbols)} symbols ({run_start} → {run_end})")
+            fetched = self.fetch_range_many(run_symbols, _day_start(run_start), _day_start(run_end + timedelta(days=1)), timeframe)
+            last_complete = min(run_end, today - timedelta(days=1))
+            for symbol in run_symbols:
+                df = fetched.get(symbol, pd.DataFrame())
+                self._write_days(symbol, df, run_start, last_complete, timeframe)
+                if not df.empty:
+                    frames[symbol].append(df)
+
+        result = {}
+        for symbol, parts in frames.items():
+            parts = [f for f in parts if not f.empty]
+            if not parts:
+                result[symbol] = pd.DataFrame()
+                continue
+            df = pd.concat(parts).sort_index()
+            result[symbol] = df[~df.index.duplicated(keep='last')]
+        return result
+
+    def _contiguous_runs(self, days):
+        runs = []
+        for day in days:
+            if runs and day - runs[-1][1] == timedelta(days=1):
+                runs[-1][1] = day
+            else:
+                runs.append([day, day])
+        return [tuple(r) for r in runs]
+
+    def fetch_range(self, symbol, start, end=None, timeframe=TimeFrame.Minute):
+        """Fetch bars for [start, end) straight from Alpaca, bypassing the cache"""
+        return self.fetch_range_many([symbol], start, end, timeframe).get(symbol, pd.DataFrame())
+
+    def fetch_range_many(self, symbols, start, end=None, timeframe=TimeFrame.Minute):
+        """Fetch bars for all symbols in one (SDK-paginated) request and split them per symbol"""
+        if not symbols:
+            return {}
+        request_params = StockBarsRequest(
+            symbol_or_symbols=list(symbols),
+            timeframe=timeframe,
+            start=start,
+            end=end
+        )
+        bars = self.client.get_stock_bars(request_params).df
+        if bars.empty:
+            return {}
+        return {symbol: bars_to_frame(group) for symbol, group in bars.groupby(level='symbol')}
+
+    def _write_days(self, symbol, df, first_day, last_day, timeframe):
+        """Persist one partition per completed day in [first_day, last_day], including empty days"""
+        if last_day < first_day:
+            return
+        local_days = df.index.tz_convert(TIMEZONE).date if not df.empty else []
+        current = first_day
+        while current <= last_day:
+            day_df = df[local_days == current] if len(local_days) else df
+            path = self.get_day_path(symbol, current, timeframe)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            day_df.to_parquet(tmp)
+            tmp.replace(path)
+            current += timedelta(days=1)
+
+
+class BarBuffer:
+    """
+    Rolling in-memory window of the newest bars for each symbol.
+    The first read seeds the window from the bar store; every later read only
+    requests bars strictly newer than the last timestamp already held, one request
+    per group of symbols whose windows end within delta_bucket_seconds of each other.
+    Symbols not requested for idle_seconds are dropped, and a symbol that came back
+    empty is not re-seeded for empty_retry_seconds.
+    """
+
+    def __init__(self, store=None, max_bars=LIVE_BUFFER_BARS, seed_days=LIVE_SEED_DAYS, timeframe=TimeFrame.Minute,
+                 idle_seconds=LIVE_IDLE_SECONDS, empty_retry_seconds=LIVE_EMPTY_RETRY_SECONDS,
+                 delta_bucket_seconds=LIVE_DELTA_BUCKET_SECONDS):
+        self.store = store or bar_store
+        self.max_bars = max_bars
+        self.seed_days = seed_days
+        self.timeframe = timeframe
+        self.idle_seconds = idle_seconds
+        self.empty_retry_seconds = empty_retry_seconds
+        self.delta_bucket = timedelta(seconds=delta_bucket_seconds)
+        self.frames = {}
+        self.last_used = {}
+        self.empty_until = {}
+        self.lock = threading.Lock()   # get_many runs concurrently on disjoint chunks
+
+    def get(self, symbol):
+        """Return the up-to-date bar window for symbol (None if no bars are available)"""
+        return self.get_many([symbol]).get(symbol)
+
+    def get_many(self, symbols):
+        """Return {symbol: bar window} for all symbols using at most one seed request and one delta request per tail group"""
+        now = time.monotonic()
+        with self.lock:
+            self._evict_idle(now)
+            for s in symbols:
+                self.last_used[s] = now
+            unseeded = [s for s in symbols if s not in self.frames and self.empty_until.get(s, 0) <= now]
+            groups = self._delta_groups([s for s in symbols if s in self.frames])
+
+        if unseeded:
+            start = (datetime.now(TIMEZONE) - timedelta(days=self.seed_days)).date()
+            seeded = self.store.get_bars_many(unseeded, start=start, timeframe=self.timeframe)
+            with self.lock:
+                for symbol in unseeded:
+                    df = seeded.get(symbol)
+                    if df is None or df.empty:
+                        self.empty_until[symbol] = now + self.empty_retry_seconds
+                    else:
+                        self.frames[symbol] = df.tail(self.max_bars)
+                        self.empty_until.pop(symbol, None)
+
+        for since, group in groups:
+            new_bars = self.store.fetch_range_many(group, since, timeframe=self.timeframe)
+            with self.lock:
+                for symbol, new_df in new_bars.items():
+                    df = self.frames.get(symbol)
+                    if df is None:
+                        continue
+                    new_df = new_df[new_df.index > df.index[-1]]
+                    if new_df.empty:
+                        continue
+                    self.frames[symbol] = pd.concat([df, new_df]).tail(self.max_bars)
+
+        with self.lock:
+            return {s: self.frames[s] for s in symbols if s in self.frames}
+
+    def _delta_groups(self, symbols):
+        """[(since, symbols)]: symbols sorted by last bar, split where the gap exceeds delta_bucket"""
+        groups = []
+        for last, symbol in sorted((self.frames[s].index[-1], s) for s in symbols):
+            if groups and last - groups[-1][0] <= self.delta_bucket:
+                groups[-1][1].append(symbol)
+            else:
+                groups.append((last, [symbol]))
+        return [(first + timedelta(seconds=1), group) for first, group in groups]
+
+    def _evict_idle(self, now):
+        for symbol in [s for s, used in self.last_used.items() if now - used > self.idle_seconds]:
+            del self.last_used[symbol]
+            self.frames.pop(symbol, None)
+            self.empty_until.pop(symbol, None)
+
+    def clear(self, symbol=None):
+        """Drop buffered bars for one symbol (or all) so the next read reseeds"""
+        with self.lock:
+            if symbol is None:
+                self.frames.clear()
+                self.empty_until.clear()
+            else:
+                self.frames.pop(symbol, None)
+                self.empty_until.pop(symbol, None)
+
+
+# Global instance
+bar_store = BarStore()
@@ -0,0 +1,68 @@
+# services/benchmark_models.py - SPECIALIST MODEL BENCHMARK
+# Trains each ML specialist with every model_type on the labeled training data and
+# compares fit time, predict latency and held-out accuracy.
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import *
+from ml_trainer import MLTrainer
+import os
+import time
+
+MODEL_TYPES = ['random_forest', 'gradient_boosting', 'hist_gradient_boosting'] + (['xgboost'] if XGBOOST_AVAILABLE else [])
+
+
+def benchmark(df, model_types=MODEL_TYPES, n_jobs=None, latency_rows=200):
+    """
+    One row per (specialist, model_type). The split is chronological (no shuffling), so
+    accuracy is measured on bars the model has never seen the neighbours of.
+    predict_ms is the whole test set; row_latency_ms is a single-row predict, as in live trading.
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    split = int(len(df) * (1 - TRAIN_TEST_SPLIT))
+    rows = []
+    for name, cfg in SPECIALISTS.items():
+        if cfg['type'] != 'ml':
+            continue
+        features = [f for f in cfg['features'] if f in df.columns]
+        trainer = MLTrainer(n_jobs=n_jobs)
+        X_train = trainer.scaler.fit_transform(df[features].iloc[:split])
+        X_test = trainer.scaler.transform(df[features].iloc[split:])
+        y_train, y_test = df['Target'].iloc[:split], df['Target'].iloc[split:]
+        for model_type in model_types:
+            started = time.perf_counter()
+            model = trainer.train_model(model_type, X_train, y_train)
+            fit_s = time.perf_counter() - started
+
+            started = time.perf_counter()
+            predicted = model.predict(X_test)
+            predict_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            for i in range(min(latency_rows, len(X_test))):
+                model.predict_proba(X_test[i:i + 1])
+            row_latency_ms = (time.perf_counter() - started) * 1000 / max(1, min(latency_rows, len(X_test)))
+
+            rows.append({
+                'specialist': name,
+                'model_type': model_type,
+                'current': model_type == cfg['model_type'],
+                'fit_s': round(fit_s, 3),
+                'predict_ms': round(predict_ms, 2),
+                'row_latency_ms': round(row_latency_ms, 3),
+                'accuracy': round(float((predicted == y_test.values).mean()), 4),
+            })
+            logger.info(f"{name:<11} {model_type:<23} fit {fit_s:7.2f}s  predict {predict_ms:8.1f}ms  "
+                        f"row {row_latency_ms:6.3f}ms  acc {rows[-1]['accuracy']:.3f}")
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    df = MLTrainer().get_training_data()
+    if df is None:
+        sys.exit(1)
+    results = benchmark(df, model_types=sys.argv[1:] or MODEL_TYPES)
+    results.to_csv(MODELS_DIR / "model_benchmark.csv", index=False)
+    print(results.to_string(index=False))
@@ -1,32 +1,43 @@
 # build_dataset.py - REAL 90-DAY DATA
 from config import *
-from alpaca.data.requests import StockBarsRequest
-from alpaca.data.timeframe import TimeFrame
+from bar_store import bar_store
+from ml_trainer import MLTrainer, write_training_parquet
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
+import os
 import numpy as np
+import pyarrow.dataset as pa_dataset
 
 def download_intraday(symbol, strategy='macd_crossover'):
     try:
-        logger.info(f"Fetching REAL 1-min data for {symbol} (last 90 days)...")
-        request_params = StockBarsRequest(
-            symbol_or_symbols=symbol,
-            timeframe=TimeFrame.Minute,
-            start=(datetime.now(TIMEZONE) - timedelta(days=90)).date(),
-            limit=10000
-        )
-        bars = data_client.get_stock_bars(request_params).df
-        if bars.empty:
+        logger.info(f"Loading REAL 1-min data for {symbol} (last 90 days)...")
+        df = bar_store.get_bars(symbol, start=(datetime.now(TIMEZONE) - timedelta(days=90)).date())
+        if df.empty:
             logger.warning(f"No real data for {symbol}, using synthetic fallback")
             return generate_synthetic_data(symbol)
-        df = bars.reset_index()
-        df = df.rename(columns={'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume', 'timestamp': 'timestamp'})
-        df = df.set_index('timestamp')
-        logger.info(f"Downloaded {len(df):,} real 1-min bars for {symbol}")
+        logger.info(f"Loaded {len(df):,} real 1-min bars for {symbol}")
         return df
     except Exception as e:
         logger.warning(f"Alpaca failed for {symbol}: {e} — using synthetic fallback")
         return generate_synthetic_data(symbol)
 
+def download_intraday_many(symbols, strategy='macd_crossover'):
+    """Load 90 days of 1-min bars for every symbol with one batched request per uncached range"""
+    try:
+        logger.info(f"Loading REAL 1-min data for {len(symbols)} symbols (last 90 days)...")
+        bars = bar_store.get_bars_many(symbols, start=(datetime.now(TIMEZONE) - timedelta(days=90)).date())
+    except Exception as e:
+        logger.warning(f"Alpaca batch fetch failed: {e} — using synthetic fallback")
+        bars = {}
+    result = {}
+    for symbol in symbols:
+        df = bars.get(symbol)
+        if df is None or df.empty:
+            logger.warning(f"No real data for {symbol}, using synthetic fallback")
+            df = generate_synthetic_data(symbol)
+        result[symbol] = df
+    return result
+
 def generate_synthetic_data(symbol, num_days=2000, strategy='macd_crossover'):
     logger.info(f"Generating synthetic fallback for {symbol}")
     np.random.seed(hash(symbol + strategy) % 2**32)
@@ -53,7 +64,8 @@ def get_most_active_symbols_with_price_filter():
     logger.info(f"Using fallback: {len(fallback)} stocks")
     return fallback
 
-def add_features_and_target(df):
+def compute_features(df):
+    """Inference path: add indicator columns to df in place (no lookahead, no copy, keeps the latest bar)"""
     df['Typical_Price'] = (df['High'] + df['Low'] + df['Close']) / 3
     df['TP_Volume'] = df['Typical_Price'] * df['Volume']
     df['Cum_TP_Volume'] = df['TP_Volume'].cumsum()
@@ -89,32 +101,55 @@ def add_features_and_target(df):
     df['ZScore'] = (df['Close'] - df['Close'].rolling(20).mean()) / df['Close'].rolling(20).std()
     df['Volume_SMA_Ratio'] = df['Volume'] / df['Volume'].rolling(20).mean()
     df['Volatility_Ratio'] = df['Close'].rolling(20).std() / df['Close'].rolling(100).std()
+    df['MACD_Cross_Up'] = (df['MACD'].shift(1) <= df['MACD_Signal'].shift(1)) & (df['MACD'] > df['MACD_Signal'])
+
+    df.fillna(0, inplace=True)
+    return df
 
+def compute_labels(df):
+    """Training path: add Future_Return/Target to a compute_features frame and drop the unlabeled tail"""
     df['Future_Return'] = df['Close'].shift(-LOOKAHEAD_BARS) / df['Close'] - 1
-    df['MACD_Cross_Up'] = (df['MACD'].shift(1) <= df['MACD_Signal'].shift(1)) & (df['MACD'] > df['MACD_Signal'])
     condition = (df['MACD_Cross_Up'] & (df['Close'] > df['VWAP']) & (df['Future_Return'] > PROFIT_THRESHOLD * 0.5))
     df['Target'] = 0
     df.loc[condition, 'Target'] = 1
+    return df.iloc[:-LOOKAHEAD_BARS]
 
-    df = df.iloc[:-LOOKAHEAD_BARS]
-    df = df.fillna(0)
-    return df
+def add_features_and_target(df):
+    return compute_labels(compute_features(df))
+
+def _build_symbol(symbol, bars):
+    """Process-pool task: features + labels for one symbol, written to its Parquet partition"""
+    df = add_features_and_target(bars)
+    df = df.rename_axis('Timestamp').reset_index()
+    df['Symbol'] = symbol
+    write_training_parquet(df, f"{symbol}_labeled.parquet")
+    return len(df)
+
+def combined_dataset():
+    """Lazy view over every symbol's labeled partition (nothing is read until scanned)"""
+    return pa_dataset.dataset(MLTrainer().training_files(), format="parquet")
+
+def build_datasets(symbols, workers=None):
+    """
+    Download every symbol once, then featurize symbols in parallel. Labels don't depend
+    on the strategy, so each symbol is written once and shared by every strategy.
+    """
+    bars = download_intraday_many(symbols)
+    if not bars:
+        logger.warning("No symbols to build datasets for")
+        return
+    workers = workers or DATASET_WORKERS or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=min(workers, len(bars))) as pool:
+        futures = {pool.submit(_build_symbol, sym, df): sym for sym, df in bars.items()}
+        for future in as_completed(futures):
+            sym = futures[future]
+            try:
+                logger.info(f"Saved {future.result():,} bars to {sym}_labeled.parquet")
+            except Exception as e:
+                logger.error(f"Dataset build failed for {sym}: {e}")
+    logger.info(f"Combined dataset: {combined_dataset().count_rows():,} bars")
 
 if __name__ == "__main__":
     logger.info("Starting REAL 90-day dataset build...")
-    symbols = get_most_active_symbols_with_price_filter()
-    strategies = ['macd_crossover', 'scalping']
-    for strategy in strategies:
-        all_data = {}
-        for sym in symbols:
-            df = download_intraday(sym, strategy)
-            if df is not None:
-                df = add_features_and_target(df)
-                all_data[sym] = df
-                df.to_csv(f"{sym}_{strategy}_labeled.csv")
-                logger.info(f"Saved {len(df):,} real bars to {sym}_{strategy}_labeled.csv")
-        if all_data:
-            combined = pd.concat(all_data.values(), keys=all_data.keys())
-            combined.to_csv(f"combined_{strategy}_dataset.csv")
-            logger.info(f"Combined {strategy} dataset: {len(combined):,} real bars")
+    build_datasets(get_most_active_symbols_with_price_filter())
     logger.info("✅ Real 90-day dataset build complete!")
\ No newline at end of file
@@ -32,11 +32,18 @@ try:
 except ImportError:
     TALIB_AVAILABLE = False
 
+# XGBoost (optional specialist backend)
+try:
+    from xgboost import XGBClassifier
+    XGBOOST_AVAILABLE = True
+except ImportError:
+    XGBOOST_AVAILABLE = False
+
 from alpaca.trading.client import TradingClient
 from alpaca.data import StockHistoricalDataClient
 from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, HistGradientBoostingClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 import joblib
@@ -52,7 +59,18 @@ PAPER_MODE = os.getenv("PAPER_MODE", "True").lower() in ("true", "1", "yes")
 TIMEZONE = pytz.timezone('US/Eastern')
 MODELS_DIR = Path(__file__).parent / "models"
 MODELS_DIR.mkdir(exist_ok=True)
-KNOWLEDGE_BASE = MODELS_DIR / "knowledge_base.json"
+KNOWLEDGE_BASE = MODELS_DIR / "knowledge_base.json"   # legacy list, read-only
+KNOWLEDGE_LOG = MODELS_DIR / "knowledge_base.jsonl"   # append-only specialist insights
+BAR_CACHE_DIR = MODELS_DIR / "bar_cache"   # <timeframe>/<symbol>/<YYYY-MM-DD>.parquet
+WALK_FORWARD_DIR = MODELS_DIR / "walk_forward"   # fold models keyed by training-data hash
+LOGS_DIR = Path(__file__).parent / "logs"
+STRATEGY_LOGS_DIR = LOGS_DIR / "strategies"
+STRATEGY_LOGS_DIR.mkdir(parents=True, exist_ok=True)
+TRADE_DB_PATH = LOGS_DIR / "trades.db"
+ORDER_INDEX_PATH = LOGS_DIR / "order_index.jsonl"   # order_id -> (date, strategy, journal offsets)
+TRADE_LOCK_PATH = LOGS_DIR / "trades.lock"   # inter-process lock held while trade logs are written
+ROLLUPS_DIR = LOGS_DIR / "rollups"   # per-day statistics rollups, <YYYY-MM-DD>.json
+TRADE_STORE_BACKEND = os.getenv("TRADE_STORE_BACKEND", "journal").lower()   # "journal" (JSON-lines files) or "sqlite"
 
 # MISSING CONSTANTS FOR MARKET SCHEDULER
 TRAIN_TIME = "20:00"          # 8 PM ET - daily training
@@ -66,6 +84,7 @@ MARKET_CLOSE_MIN = 0
 trade_client = TradingClient(API_KEY, API_SECRET, paper=PAPER_MODE)
 data_client = StockHistoricalDataClient(API_KEY, API_SECRET)
 
+# model_type: random_forest | gradient_boosting | hist_gradient_boosting | xgboost (falls back to hist_gradient_boosting when not installed)
 SPECIALISTS = {
     'momentum': {'name': 'Momentum Agent', 'type': 'ml', 'features': ['MACD', 'MACD_Hist', 'RSI', 'ADX'], 'model_type': 'random_forest', 'min_confidence': 0.68},
     'reversion': {'name': 'Mean-Reversion Agent', 'type': 'ml', 'features': ['Bollinger_Width', 'RSI', 'ZScore'], 'model_type': 'gradient_boosting', 'min_confidence': 0.72},
@@ -77,6 +96,7 @@ SPECIALISTS = {
 }
 
 MIN_CONFIDENCE = 0.60
+ENSEMBLE_BUY_FRACTION = 0.25   # ensemble votes BUY when buy confidence > this share of total (lowered for dynamic testing)
 POSITION_SIZE_PCT = 50
 MAX_OPEN_POSITIONS = 10
 STOP_LOSS_PCT = 0.02
@@ -84,5 +104,26 @@ TAKE_PROFIT_PCT = 0.04
 LOOKAHEAD_BARS = 5
 PROFIT_THRESHOLD = 0.001
 TRAIN_TEST_SPLIT = 0.2
+LIVE_BUFFER_BARS = 500        # bars kept in memory per symbol by the live trader
+LIVE_SEED_DAYS = 5            # history loaded when a symbol's buffer is first seeded
+LIVE_IDLE_SECONDS = 900       # buffered symbols not requested for this long are dropped
+LIVE_EMPTY_RETRY_SECONDS = 300  # a symbol that returned no bars is not re-seeded before this
+LIVE_DELTA_BUCKET_SECONDS = 300  # symbols whose last bars are this close share one delta request
+SCAN_UNIVERSE_SIZE = 15       # candidates scored per one-minute tick
+SCAN_BATCH_SIZE = 25          # symbols per multi-symbol bar request
+SCAN_FETCH_WORKERS = 4        # concurrent bar requests per tick
+NEWS_CACHE_TTL_SECONDS = 60   # RSS feeds are re-requested (conditionally) at most this often
+NEWS_SENTIMENT_CACHE_SIZE = 2048  # memoized headline sentiments kept (least recently used evicted)
+SENTIMENT_REFRESH_SECONDS = 60  # background news/twitter snapshot refresh interval
+WALK_FORWARD_HISTORY_DAYS = 90  # cached bar history the walk-forward folds slide over
+WALK_FORWARD_TRAIN_DAYS = 20  # trading days each fold trains on
+WALK_FORWARD_TEST_DAYS = 5    # trading days each fold is tested on (and the step between folds)
+JOURNAL_FSYNC_EVERY = 20      # trade journal records written between fsyncs
+JOURNAL_FSYNC_SECONDS = 1.0   # ...or at most this long between fsyncs
+EXPORT_CHUNK_SIZE = 5000      # trades held in memory per chunk when exporting CSV/Parquet
+KNOWLEDGE_RECENT = 1000       # knowledge-base entries kept in the in-memory cache
+TRAIN_WORKERS = 0             # specialists trained concurrently (0 = one per CPU core)
+TRAINING_ROW_GROUP = 50000    # rows per Parquet row group in training files (the streaming unit)
+DATASET_WORKERS = 0           # symbols featurized concurrently by build_dataset (0 = one per CPU core)
 
 logger.info("✅ config.py loaded with 7-agent system")
\ No newline at end of file
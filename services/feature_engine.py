@@ -0,0 +1,296 @@
+# services/feature_engine.py - STREAMING FEATURE ENGINE
+# Bar-by-bar counterpart of build_dataset.compute_features for live inference.
+# Each symbol keeps O(1) running state (running sums, recursive EMAs, fixed-size
+# ring buffers) and emits the feature row for the newest bar only.
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import *
+from collections import deque
+import math
+
+FEATURE_COLUMNS = [
+    'Typical_Price', 'TP_Volume', 'Cum_TP_Volume', 'Cum_Volume', 'VWAP', 'VWAP_Deviation',
+    'MACD', 'MACD_Signal', 'MACD_Hist', 'RSI', 'ATR', 'OBV', 'Bollinger_Width',
+    'High_Low_Range', 'Close_vs_High', 'ZScore', 'Volume_SMA_Ratio', 'Volatility_Ratio',
+    'MACD_Cross_Up',
+]
+
+NAN = float('nan')
+
+
+class PandasEWM:
+    """Recursive EMA matching Series.ewm(span=span, adjust=False).mean()"""
+
+    def __init__(self, span):
+        comass = (span - 1) / 2.0
+        self.alpha = 1. / (1. + comass)
+        self.old_wt = 1. - self.alpha
+        self.value = None
+
+    def update(self, x):
+        if self.value is None:
+            self.value = x
+        elif self.value != x:
+            self.value = (self.old_wt * self.value + self.alpha * x) / (self.old_wt + self.alpha)
+        return self.value
+
+
+class TalibEMA:
+    """EMA seeded with the SMA of its first `period` inputs, matching TA-Lib's TA_INT_EMA"""
+
+    def __init__(self, period):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self.seed_total = 0.0
+        self.seed_count = 0
+        self.value = None
+
+    def update(self, x):
+        if self.value is None:
+            self.seed_total += x
+            self.seed_count += 1
+            if self.seed_count == self.period:
+                self.value = self.seed_total / self.period
+            return self.value
+        self.value = ((x - self.value) * self.k) + self.value
+        return self.value
+
+
+class RollingWindow:
+    """Fixed-size ring buffer giving the same mean/std(ddof=1) as Series.rolling(n)"""
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque(maxlen=size)
+
+    def append(self, x):
+        self.values.append(x)
+
+    def ready(self):
+        return len(self.values) == self.size
+
+    def mean(self):
+        if not self.ready():
+            return NAN
+        return float(np.mean(np.fromiter(self.values, dtype=np.float64, count=self.size)))
+
+    def std(self):
+        if not self.ready():
+            return NAN
+        arr = np.fromiter(self.values, dtype=np.float64, count=self.size)
+        if (arr == arr[0]).all():
+            return 0.0
+        return float(np.std(arr, ddof=1))
+
+
+class IncrementalFeatureEngine:
+    """
+    Streaming feature state for a single symbol.
+    Feeding bars one at a time yields, for each bar, the same feature values
+    compute_features would compute for that bar over every bar the
+    engine has seen (to floating-point tolerance).
+    Follows the TA-Lib branch when TA-Lib is installed, the pandas fallback otherwise.
+    """
+
+    def __init__(self, use_talib=None):
+        self.use_talib = TALIB_AVAILABLE if use_talib is None else use_talib
+        self.bar_count = 0
+        self.last_timestamp = None
+        self.latest = None
+
+        self.cum_tp_volume = 0.0
+        self.cum_volume = 0.0
+        self.prev_close = None
+        self.prev_macd = NAN
+        self.prev_signal = NAN
+
+        self.close_20 = RollingWindow(20)
+        self.close_100 = RollingWindow(100)
+        self.volume_20 = RollingWindow(20)
+
+        if self.use_talib:
+            self.ema_fast = TalibEMA(12)
+            self.ema_slow = TalibEMA(26)
+            self.ema_signal = TalibEMA(9)
+            self.rsi_gain = 0.0
+            self.rsi_loss = 0.0
+            self.tr_total = 0.0
+            self.atr = None
+            self.obv = None
+            self.bb_window = deque(maxlen=20)
+            self.bb_total = 0.0
+            self.bb_total2 = 0.0
+        else:
+            self.ema_fast = PandasEWM(12)
+            self.ema_slow = PandasEWM(26)
+            self.ema_signal = PandasEWM(9)
+            self.obv = 0.0
+
+    def update(self, bar, timestamp=None):
+        """Consume one bar (mapping with Open/High/Low/Close/Volume) and return its feature dict"""
+        h = float(bar['High'])
+        l = float(bar['Low'])
+        c = float(bar['Close'])
+        v = float(bar['Volume'])
+        i = self.bar_count
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            row = {}
+            row['Typical_Price'] = (h + l + c) / 3
+            row['TP_Volume'] = row['Typical_Price'] * v
+            self.cum_tp_volume += row['TP_Volume']
+            self.cum_volume += v
+            row['Cum_TP_Volume'] = self.cum_tp_volume
+            row['Cum_Volume'] = self.cum_volume
+            row['VWAP'] = float(np.float64(self.cum_tp_volume) / self.cum_volume)
+            row['VWAP_Deviation'] = float(np.float64(c - row['VWAP']) / row['VWAP'])
+
+            if self.use_talib:
+                self._update_talib(row, i, h, l, c, v)
+            else:
+                self._update_fallback(row, h, l, c, v)
+
+            self.close_20.append(c)
+            self.close_100.append(c)
+            self.volume_20.append(v)
+            std_20 = self.close_20.std()
+            row['High_Low_Range'] = h - l
+            row['Close_vs_High'] = float(np.float64(c) / h)
+            # a flat window has no spread: zero deviation, as the batch 0/0 -> NaN -> 0 gives
+            row['ZScore'] = float(np.float64(c - self.close_20.mean()) / std_20) if std_20 != 0 else 0.0
+            row['Volume_SMA_Ratio'] = float(np.float64(v) / self.volume_20.mean())
+            row['Volatility_Ratio'] = float(np.float64(std_20) / self.close_100.std())
+
+        row['MACD_Cross_Up'] = bool(self.prev_macd <= self.prev_signal and row['MACD'] > row['MACD_Signal'])
+        self.prev_macd = row['MACD']
+        self.prev_signal = row['MACD_Signal']
+        self.prev_close = c
+
+        for key, value in row.items():
+            if isinstance(value, float) and not math.isfinite(value):
+                row[key] = 0.0   # NaN (warm-up) and +-inf (zero divisors) would break the scaler
+
+        bar_values = dict(bar)
+        bar_values.update(row)
+        self.bar_count += 1
+        self.last_timestamp = timestamp
+        self.latest = bar_values
+        return row
+
+    def _update_fallback(self, row, h, l, c, v):
+        fast = self.ema_fast.update(c)
+        slow = self.ema_slow.update(c)
+        macd = fast - slow
+        signal = self.ema_signal.update(macd)
+        row['MACD'] = macd
+        row['MACD_Signal'] = signal
+        row['MACD_Hist'] = macd - signal
+        row['RSI'] = 50.0
+        row['ATR'] = h - l
+        self.obv += v
+        row['OBV'] = self.obv
+        row['Bollinger_Width'] = 0.05
+
+    def _update_talib(self, row, i, h, l, c, v):
+        # MACD(12, 26, 9): the fast EMA is seeded on the 12 bars ending where the slow EMA starts
+        if i >= 26 - 12:
+            self.ema_fast.update(c)
+        self.ema_slow.update(c)
+        signal = None
+        macd = NAN
+        if self.ema_slow.value is not None:
+            macd = self.ema_fast.value - self.ema_slow.value
+            signal = self.ema_signal.update(macd)
+        if signal is None:
+            row['MACD'] = row['MACD_Signal'] = row['MACD_Hist'] = NAN
+        else:
+            row['MACD'] = macd
+            row['MACD_Signal'] = signal
+            row['MACD_Hist'] = macd - signal
+
+        # RSI(14), Wilder smoothing
+        row['RSI'] = NAN
+        if i >= 1:
+            diff = c - self.prev_close
+            if i <= 14:
+                if diff < 0:
+                    self.rsi_loss -= diff
+                else:
+                    self.rsi_gain += diff
+                if i == 14:
+                    self.rsi_loss /= 14
+                    self.rsi_gain /= 14
+            else:
+                self.rsi_loss *= 13
+                self.rsi_gain *= 13
+                if diff < 0:
+                    self.rsi_loss -= diff
+                else:
+                    self.rsi_gain += diff
+                self.rsi_loss /= 14
+                self.rsi_gain /= 14
+            if i >= 14:
+                total = self.rsi_gain + self.rsi_loss
+                row['RSI'] = 100.0 * (self.rsi_gain / total) if not (-0.00000001 < total < 0.00000001) else 0.0
+
+        # ATR(14): SMA of the first 14 true ranges, then Wilder smoothing
+        row['ATR'] = NAN
+        if i >= 1:
+            true_range = h - l
+            if abs(self.prev_close - h) > true_range:
+                true_range = abs(self.prev_close - h)
+            if abs(self.prev_close - l) > true_range:
+                true_range = abs(self.prev_close - l)
+            if i <= 14:
+                self.tr_total += true_range
+                if i == 14:
+                    self.atr = self.tr_total / 14
+            else:
+                self.atr *= 14 - 1
+                self.atr += true_range
+                self.atr /= 14
+            if self.atr is not None:
+                row['ATR'] = self.atr
+
+        # OBV
+        if self.obv is None:
+            self.obv = v
+        elif c > self.prev_close:
+            self.obv += v
+        elif c < self.prev_close:
+            self.obv -= v
+        row['OBV'] = self.obv
+
+        # BBANDS(20, 2, 2, SMA) via running sums
+        self.bb_window.append(c)
+        self.bb_total += c
+        self.bb_total2 += c * c
+        row['Bollinger_Width'] = NAN
+        if len(self.bb_window) == 20:
+            trailing = self.bb_window[0]
+            middle = self.bb_total / 20
+            mean_sq = self.bb_total2 / 20
+            self.bb_total -= trailing
+            self.bb_total2 -= trailing * trailing
+            mean_sq -= middle * middle
+            std = math.sqrt(mean_sq) if not mean_sq < 0.00000001 else 0.0
+            band = std * 2.0
+            upper = middle + band
+            lower = middle - band
+            row['Bollinger_Width'] = float(np.float64(upper - lower) / middle)
+
+    def update_frame(self, df):
+        """Consume every bar in df newer than the last one seen; return the latest feature row as a 1-row DataFrame"""
+        new_bars = df if self.last_timestamp is None else df[df.index > self.last_timestamp]
+        for timestamp, bar in zip(new_bars.index, new_bars.to_dict('records')):
+            self.update(bar, timestamp)
+        return self.latest_frame()
+
+    def latest_frame(self):
+        """Return the newest bar with its features as a 1-row DataFrame (None before the first bar)"""
+        if self.latest is None:
+            return None
+        return pd.DataFrame([self.latest], index=pd.Index([self.last_timestamp], name='timestamp'))
@@ -0,0 +1,80 @@
+# file_lock.py
+# Inter-process advisory lock used around every trade-log write.
+# One FileLock exists per lock-file path in a process (see file_lock), so every
+# TradeJournal/TradeRollups naming the same path shares it and nested acquisition
+# from one thread never deadlocks.
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import os
+import threading
+import time
+
+if os.name == 'nt':
+    import msvcrt
+
+    def _lock(fd):
+        os.lseek(fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                time.sleep(0.01)
+
+    def _unlock(fd):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock(fd):
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock(fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class FileLock:
+    """Reentrant exclusive lock: a thread lock in this process plus flock/msvcrt on the lock file across processes"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+
+    def __enter__(self):
+        self.lock.acquire()
+        try:
+            if self.depth == 0:
+                if self.fd is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                _lock(self.fd)
+            self.depth += 1
+        except BaseException:
+            self.lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self.depth -= 1
+        if self.depth == 0:
+            _unlock(self.fd)
+        self.lock.release()
+
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def file_lock(path):
+    """The process-wide FileLock for a lock-file path"""
+    key = os.path.abspath(path)
+    with _locks_guard:
+        if key not in _locks:
+            _locks[key] = FileLock(key)
+        return _locks[key]
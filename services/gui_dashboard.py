@@ -5,18 +5,111 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from config import *
 from ml_ensemble import EnsembleCoordinator
+from ml_specialist import Specialist
+from bar_store import BarBuffer
+from feature_engine import IncrementalFeatureEngine
+from knowledge_base import knowledge_base
 from PyQt5.QtWidgets import *
-from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtCore import QTimer, Qt, QObject, QThread, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import QFont, QColor
 import json
 
+
+class DashboardDataWorker(QObject):
+    """
+    Runs on a background QThread. Each refresh fetches SPY bars and engineers
+    features ONCE (rolling bar buffer + streaming feature engine), scores every
+    agent on that one frame, reads the knowledge base, and emits a single
+    snapshot that all dashboard panels render from.
+    """
+    snapshot_ready = pyqtSignal(dict)
+    error = pyqtSignal(str)
+
+    def __init__(self, symbol="SPY"):
+        super().__init__()
+        self.symbol = symbol
+        self.ensemble = None
+        self.bar_buffer = None
+        self.feature_engine = None
+
+    @pyqtSlot()
+    def refresh(self):
+        try:
+            if self.ensemble is None:
+                # Built on the worker thread so model loading never blocks the UI
+                self.ensemble = EnsembleCoordinator()
+                self.bar_buffer = BarBuffer()
+                self.feature_engine = IncrementalFeatureEngine()
+            self.snapshot_ready.emit(self.build_snapshot())
+        except Exception as e:
+            logger.error(f"Dashboard refresh failed: {e}")
+            self.error.emit(str(e))
+
+    def build_snapshot(self):
+        snapshot = {'votes': {}, 'ensemble': None, 'agree': 0}
+        df = self.get_sample_features()
+        if df is not None:
+            votes = []
+            for name, agent in self.ensemble.specialists.items():
+                if isinstance(agent, Specialist):
+                    pred = agent.predict(df)
+                else:
+                    pred = self.ensemble.external_vote(name, self.symbol)
+                snapshot['votes'][name] = pred
+                votes.append((pred['signal'], pred['confidence'], pred.get('rationale', '')))
+            snapshot['ensemble'] = self.ensemble.combine(votes)
+            snapshot['agree'] = len([v for v, _, _ in votes if v == 1])
+
+        snapshot['accuracy'] = {name: self.get_agent_accuracy(name) for name in SPECIALISTS}
+        snapshot['insights'] = {name: self.get_last_insight(name) for name in SPECIALISTS}
+        snapshot['kb_recent'] = knowledge_base.recent(20)
+        snapshot['recent_trades'] = self.get_recent_trades()
+        return snapshot
+
+    def get_sample_features(self):
+        """Latest feature row for the dashboard symbol (only new bars are fetched and processed)"""
+        bars = self.bar_buffer.get(self.symbol)
+        if bars is None or bars.empty:
+            return None
+        return self.feature_engine.update_frame(bars)
+
+    def get_agent_accuracy(self, name):
+        accuracy = knowledge_base.latest_accuracy(name)
+        return accuracy * 100 if accuracy is not None else 85.0
+
+    def get_last_insight(self, name):
+        entry = knowledge_base.latest(name)
+        if entry is None:
+            return "No insight yet"
+        return entry.get('insight', entry.get('rationale', 'No insight'))
+
+    def get_recent_trades(self):
+        history_file = MODELS_DIR / "trade_history.json"
+        if not history_file.exists():
+            return None
+        with open(history_file, 'r') as f:
+            return json.load(f).get('trades', [])[-10:]
+
+
 class TradingDashboard(QMainWindow):
+    refresh_requested = pyqtSignal()
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("7-Agent Ensemble Live Dashboard")
         self.resize(1700, 1000)
-        self.ensemble = EnsembleCoordinator()
         self.setup_ui()
+
+        # Data loading happens on a worker thread; the UI only renders snapshots
+        self.refresh_pending = False
+        self.worker_thread = QThread(self)
+        self.worker = DashboardDataWorker()
+        self.worker.moveToThread(self.worker_thread)
+        self.refresh_requested.connect(self.worker.refresh)
+        self.worker.snapshot_ready.connect(self.apply_snapshot)
+        self.worker.error.connect(self.on_refresh_error)
+        self.worker_thread.start()
+
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_dashboard)
         self.timer.start(4000)  # update every 4 seconds
@@ -67,106 +160,73 @@ class TradingDashboard(QMainWindow):
         layout.addWidget(self.recent_text)
 
     def update_dashboard(self):
+        """Ask the worker for a new snapshot (skipped while the previous one is still loading)"""
+        if self.refresh_pending:
+            return
+        self.refresh_pending = True
+        self.refresh_requested.emit()
+
+    def on_refresh_error(self, message):
+        self.refresh_pending = False
+
+    def apply_snapshot(self, snapshot):
+        self.refresh_pending = False
+        votes = snapshot['votes']
+
         self.table.setRowCount(0)
         row = 0
         for name, cfg in SPECIALISTS.items():
             self.table.insertRow(row)
             self.table.setItem(row, 0, QTableWidgetItem(cfg['name']))
 
-            acc = self.get_agent_accuracy(name)
+            acc = snapshot['accuracy'][name]
             self.table.setItem(row, 1, QTableWidgetItem(f"{acc:.1f}%"))
 
-            try:
-                df = self.get_sample_features()
-                if df is not None:
-                    pred = self.ensemble.specialists[name].predict(df) if hasattr(self.ensemble.specialists[name], 'predict') else {"confidence": 0.95, "signal": 0}
-                    conf = pred.get('confidence', 0.95) * 100
-                    vote = "BUY" if pred.get('signal') == 1 else "HOLD"
-                    self.table.setItem(row, 2, QTableWidgetItem(f"{conf:.1f}%"))
-                    self.table.setItem(row, 4, QTableWidgetItem(vote))
-                else:
-                    self.table.setItem(row, 2, QTableWidgetItem("N/A"))
-                    self.table.setItem(row, 4, QTableWidgetItem("N/A"))
-            except:
+            pred = votes.get(name)
+            if pred is not None:
+                conf = pred.get('confidence', 0.95) * 100
+                vote = "BUY" if pred.get('signal') == 1 else "HOLD"
+                self.table.setItem(row, 2, QTableWidgetItem(f"{conf:.1f}%"))
+                self.table.setItem(row, 4, QTableWidgetItem(vote))
+            else:
                 self.table.setItem(row, 2, QTableWidgetItem("N/A"))
                 self.table.setItem(row, 4, QTableWidgetItem("N/A"))
 
-            insight = self.get_last_insight(name)
+            insight = snapshot['insights'][name]
             self.table.setItem(row, 3, QTableWidgetItem(insight[:80] + "..." if len(insight) > 80 else insight))
             self.table.setItem(row, 5, QTableWidgetItem("$0"))
             row += 1
 
-        if KNOWLEDGE_BASE.exists():
-            try:
-                with open(KNOWLEDGE_BASE, 'r') as f:
-                    kb = json.load(f)[-20:]
-                text = "\n".join([f"[{e.get('date','')[:16]}] {e.get('specialist','')}: {e.get('insight', e.get('rationale',''))}" for e in kb])
-                self.kb_text.setText(text)
-            except:
-                self.kb_text.setText("Knowledge base loading...")
-
-        try:
-            df = self.get_sample_features()
-            if df is not None:
-                result = self.ensemble.predict(df, "SPY")
-                status = "BUY" if result.get('recommendation') == "BUY" else "HOLD"
-                conf = result.get('confidence', 0) * 100
-                self.ensemble_label.setText(f"Ensemble: {status} ({conf:.1f}%) — 0/7 agree")
-        except:
-            self.ensemble_label.setText("Ensemble: HOLD (0.0%) — 0/7 agree")
+        kb = snapshot['kb_recent']
+        if kb:
+            text = "\n".join([f"[{e.get('date','')[:16]}] {e.get('specialist','')}: {e.get('insight', e.get('rationale',''))}" for e in kb])
+            self.kb_text.setText(text)
 
-        self.update_recent_activity()
-
-    def update_recent_activity(self):
-        history_file = MODELS_DIR / "trade_history.json"
-        if history_file.exists():
-            try:
-                with open(history_file, 'r') as f:
-                    data = json.load(f)
-                trades = data.get('trades', [])[-10:]
-                text = "\n".join([f"{t.get('entry_time','')[:16]} | {t['symbol']} | {t['side']} | Conf: {t.get('confidence',0):.1%} | {t.get('status','')}" for t in trades])
-                self.recent_text.setText(text if text else "No trades or signals yet")
-            except:
-                self.recent_text.setText("Error reading activity log")
+        result = snapshot['ensemble']
+        if result is not None:
+            status = "BUY" if result.get('recommendation') == "BUY" else "HOLD"
+            conf = result.get('confidence', 0) * 100
+            self.ensemble_label.setText(f"Ensemble: {status} ({conf:.1f}%) — {snapshot['agree']}/{len(SPECIALISTS)} agree")
         else:
-            self.recent_text.setText("No trades or signals yet - waiting for first BUY vote")
+            self.ensemble_label.setText(f"Ensemble: HOLD (0.0%) — 0/{len(SPECIALISTS)} agree")
 
-    def get_agent_accuracy(self, name):
-        if not KNOWLEDGE_BASE.exists():
-            return 85.0
-        try:
-            with open(KNOWLEDGE_BASE, 'r') as f:
-                kb = json.load(f)
-            for entry in reversed(kb):
-                if entry.get('specialist') == name and 'test_accuracy' in entry:
-                    return entry['test_accuracy'] * 100
-            return 85.0
-        except:
-            return 85.0
+        self.update_recent_activity(snapshot['recent_trades'])
 
-    def get_last_insight(self, name):
-        if not KNOWLEDGE_BASE.exists():
-            return "No insight yet"
+    def update_recent_activity(self, trades):
+        if trades is None:
+            self.recent_text.setText("No trades or signals yet - waiting for first BUY vote")
+            return
         try:
-            with open(KNOWLEDGE_BASE, 'r') as f:
-                kb = json.load(f)
-            for entry in reversed(kb):
-                if entry.get('specialist') == name:
-                    return entry.get('insight', entry.get('rationale', 'No insight'))
-            return "No insight yet"
+            text = "\n".join([f"{t.get('entry_time','')[:16]} | {t['symbol']} | {t['side']} | Conf: {t.get('confidence',0):.1%} | {t.get('status','')}" for t in trades])
+            self.recent_text.setText(text if text else "No trades or signals yet")
         except:
-            return "No insight yet"
+            self.recent_text.setText("Error reading activity log")
 
-    def get_sample_features(self):
-        try:
-            from build_dataset import download_intraday, add_features_and_target
-            df = download_intraday("SPY")
-            if df is not None:
-                df = add_features_and_target(df)
-                return df
-            return None
-        except:
-            return None
+    def closeEvent(self, event):
+        self.timer.stop()
+        self.worker_thread.quit()
+        self.worker_thread.wait(5000)
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -0,0 +1,120 @@
+# services/knowledge_base.py - SPECIALIST KNOWLEDGE BASE
+# Append-only store for the insights each specialist records after training.
+# Reads are served from an in-memory cache that is only reloaded when the files
+# change on disk, with a per-specialist index of the latest entries.
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import *
+from collections import deque
+import json
+import os
+import threading
+
+
+class KnowledgeBase:
+    """
+    Entries live in KNOWLEDGE_LOG (JSON lines, appended) after those in the legacy
+    KNOWLEDGE_BASE JSON list, which is still read but no longer rewritten.
+    The cache is validated by each file's (mtime, size); when only the log has
+    grown, just the new lines are read.
+    """
+
+    def __init__(self, path=KNOWLEDGE_LOG, legacy_path=KNOWLEDGE_BASE, max_recent=KNOWLEDGE_RECENT):
+        self.path = Path(path)
+        self.legacy_path = Path(legacy_path)
+        self.max_recent = max_recent
+        self.lock = threading.RLock()
+        self.signature = None
+        self.offset = 0
+        self.recent_entries = deque(maxlen=max_recent)
+        self.latest_entry = {}
+        self.latest_accuracy_entry = {}
+
+    def append(self, entry):
+        """Record one entry (one line appended; the file is never rewritten)"""
+        line = (json.dumps(entry, default=float) + "\n").encode('utf-8')
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'ab') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._refresh()
+
+    def recent(self, count=20):
+        """The newest `count` entries, oldest first"""
+        with self.lock:
+            self._refresh()
+            return list(self.recent_entries)[-count:]
+
+    def latest(self, specialist):
+        """Newest entry recorded by a specialist (None if it has none)"""
+        with self.lock:
+            self._refresh()
+            return self.latest_entry.get(specialist)
+
+    def latest_accuracy(self, specialist):
+        """test_accuracy of the specialist's newest entry that has one (None if none)"""
+        with self.lock:
+            self._refresh()
+            entry = self.latest_accuracy_entry.get(specialist)
+            return entry['test_accuracy'] if entry else None
+
+    def _stat(self, path):
+        try:
+            st = path.stat()
+            return st.st_mtime_ns, st.st_size
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self):
+        legacy_sig, log_sig = self._stat(self.legacy_path), self._stat(self.path)
+        signature = (legacy_sig, log_sig)
+        if signature == self.signature:
+            return
+        previous = self.signature
+        self.signature = signature
+        if previous is not None and previous[0] == legacy_sig and log_sig is not None and log_sig[1] >= self.offset:
+            self._read_log()   # only the log grew: read the new lines
+            return
+
+        self.recent_entries.clear()
+        self.latest_entry.clear()
+        self.latest_accuracy_entry.clear()
+        self.offset = 0
+        if legacy_sig is not None:
+            try:
+                with open(self.legacy_path, 'r') as f:
+                    for entry in json.load(f):
+                        self._index(entry)
+            except Exception as e:
+                logger.warning(f"Could not read {self.legacy_path.name}: {e}")
+        self._read_log()
+
+    def _read_log(self):
+        if not self.path.exists():
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break   # partial line still being written
+                self.offset += len(line)
+                try:
+                    self._index(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping unreadable line in {self.path.name}")
+
+    def _index(self, entry):
+        self.recent_entries.append(entry)
+        name = entry.get('specialist')
+        self.latest_entry[name] = entry
+        if 'test_accuracy' in entry:
+            self.latest_accuracy_entry[name] = entry
+
+
+# Global instance
+knowledge_base = KnowledgeBase()
@@ -7,10 +7,12 @@ from config import *
 from ml_ensemble import EnsembleCoordinator
 from ml_trainer import MLTrainer
 from market_scheduler import MarketScheduler
-from build_dataset import get_most_active_symbols_with_price_filter, add_features_and_target
-from alpaca.data.requests import StockBarsRequest
-from alpaca.data.timeframe import TimeFrame
+from build_dataset import get_most_active_symbols_with_price_filter
+from bar_store import BarBuffer
+from feature_engine import IncrementalFeatureEngine
+from sentiment_refresher import SentimentRefresher
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import json
 import time
 
@@ -24,6 +26,10 @@ class LiveTrader:
             rebalance_callback=self.rebalance_portfolio
         )
 
+        self.bar_buffer = BarBuffer()
+        self.feature_engines = {}
+        self.fetch_pool = ThreadPoolExecutor(max_workers=SCAN_FETCH_WORKERS, thread_name_prefix="bar-fetch")
+        self.sentiment_refresher = SentimentRefresher(self.predictor.news_agent, self.predictor.twitter_agent)
         self.positions = {}
         self.trade_log = []
         self.signals_log = []
@@ -75,36 +81,40 @@ class LiveTrader:
             logger.error(f"Failed to get account info: {e}")
             return None
 
-    def can_open_position(self, symbol):
-        positions = self.get_open_positions()
+    def can_open_position(self, symbol, positions=None, account=None):
+        """Check trading limits; pass a positions/account snapshot to avoid re-querying the broker"""
+        if positions is None:
+            positions = self.get_open_positions()
         if symbol in positions:
             return False, "Already have open position"
         if len(positions) >= MAX_OPEN_POSITIONS:
             return False, f"Max open positions ({MAX_OPEN_POSITIONS}) reached"
-        account = self.get_account_info()
+        if account is None:
+            account = self.get_account_info()
         if not account or account['buying_power'] < 100:
             return False, "Insufficient buying power"
         return True, "Ready to trade"
 
     def _get_and_engineer_features(self, symbol):
-        try:
-            request_params = StockBarsRequest(
-                symbol_or_symbols=symbol,
-                timeframe=TimeFrame.Minute,
-                start=(datetime.now(TIMEZONE) - timedelta(days=5)).date(),
-                limit=500
-            )
-            bars = data_client.get_stock_bars(request_params).df
-            if bars.empty:
-                return None
-            df = bars.reset_index()
-            df = df.rename(columns={'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume', 'timestamp': 'timestamp'})
-            df = df.set_index('timestamp')
-            df = add_features_and_target(df)
-            return df
-        except Exception as e:
-            logger.warning(f"Could not fetch features for {symbol}: {e}")
-            return None
+        return self._get_and_engineer_features_many([symbol]).get(symbol)
+
+    def _get_and_engineer_features_many(self, symbols):
+        """Fetch stage (SCAN_BATCH_SIZE symbols per request, SCAN_FETCH_WORKERS in flight) + streaming features"""
+        chunks = [symbols[i:i + SCAN_BATCH_SIZE] for i in range(0, len(symbols), SCAN_BATCH_SIZE)]
+        bars = {}
+        for chunk, future in [(c, self.fetch_pool.submit(self.bar_buffer.get_many, c)) for c in chunks]:
+            try:
+                bars.update(future.result())
+            except Exception as e:
+                logger.warning(f"Could not fetch bars for {len(chunk)} symbols: {e}")
+        features = {}
+        for symbol, df in bars.items():
+            try:
+                engine = self.feature_engines.setdefault(symbol, IncrementalFeatureEngine())
+                features[symbol] = engine.update_frame(df)
+            except Exception as e:
+                logger.warning(f"Could not engineer features for {symbol}: {e}")
+        return features
 
     def submit_order(self, symbol, qty, side):
         try:
@@ -121,32 +131,44 @@ class LiveTrader:
 
     def check_and_trade(self):
         try:
+            started = time.perf_counter()
             candidates = get_most_active_symbols_with_price_filter()
             buy_signals = []
-            for symbol in candidates[:15]:
-                features_df = self._get_and_engineer_features(symbol)
-                if features_df is None or len(features_df) < 50:
-                    continue
-                result = self.predictor.predict(features_df, symbol)
-                if result.get('recommendation') == "BUY":
-                    buy_signals.append({
-                        'symbol': symbol,
-                        'price': features_df['Close'].iloc[-1],
-                        'confidence': result['confidence']
-                    })
+            features = self._get_and_engineer_features_many(candidates[:SCAN_UNIVERSE_SIZE])
+            ready = [s for s, f in features.items() if f is not None and self.feature_engines[s].bar_count >= 50]
+            if ready:
+                latest = pd.concat([features[s] for s in ready])
+                latest.index = pd.Index(ready, name='symbol')
+                results = self.predictor.predict_batch(latest)
+                for symbol in ready:
+                    result = results[symbol]
+                    if result.get('recommendation') == "BUY":
+                        buy_signals.append({
+                            'symbol': symbol,
+                            'price': latest.loc[symbol, 'Close'],
+                            'confidence': result['confidence']
+                        })
+            logger.info(f"Scanned {len(ready)} symbols in {time.perf_counter() - started:.2f}s — {len(buy_signals)} BUY signals")
+            if not buy_signals:
+                return
+
+            # One broker snapshot per tick, updated locally as orders go out
+            positions = self.get_open_positions()
+            account = self.get_account_info()
             for signal in buy_signals:
                 symbol = signal['symbol']
                 price = signal['price']
-                can_trade, reason = self.can_open_position(symbol)
+                can_trade, reason = self.can_open_position(symbol, positions, account)
                 if not can_trade:
                     continue
-                account = self.get_account_info()
                 position_value = account['buying_power'] * (POSITION_SIZE_PCT / 100.0)
                 qty = int(position_value / price)
                 if qty < 1:
                     continue
                 order = self.submit_order(symbol, qty, "buy")
                 if order:
+                    positions[symbol] = order
+                    account['buying_power'] -= qty * price
                     trade_record = {
                         'symbol': symbol,
                         'side': 'BUY',
@@ -180,6 +202,7 @@ class LiveTrader:
         try:
             self.trainer.train_all_specialists()
             self.predictor = EnsembleCoordinator()  # Reload fresh ensemble
+            self.predictor.sentiment_refresher = self.sentiment_refresher
         except Exception as e:
             logger.error(f"Scheduled training failed: {e}")
 
@@ -187,6 +210,8 @@ class LiveTrader:
         logger.info("\n" + "="*60)
         logger.info("STARTING LIVE TRADING SYSTEM - 7-AGENT ENSEMBLE ACTIVE")
         logger.info("="*60)
+        self.sentiment_refresher.start()
+        self.predictor.sentiment_refresher = self.sentiment_refresher
         self.scheduler.start()
         logger.info("Live trading system started successfully")
         return True
@@ -194,6 +219,8 @@ class LiveTrader:
     def stop(self):
         logger.info("Stopping live trading system...")
         self.scheduler.stop()
+        self.sentiment_refresher.stop()
+        self.fetch_pool.shutdown(wait=False)
         self.save_trade_history()
 
 def main():
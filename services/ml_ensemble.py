@@ -9,6 +9,7 @@ class EnsembleCoordinator:
         self.specialists = {}
         self.news_agent = NewsCatalystAgent()
         self.twitter_agent = TwitterSentimentAgent()
+        self.sentiment_refresher = None   # set by LiveTrader.start; None = fetch inline
         self.load_all()
 
     def load_all(self):
@@ -26,16 +27,59 @@ class EnsembleCoordinator:
         for name, agent in self.specialists.items():
             if isinstance(agent, Specialist):
                 pred = agent.predict(features_df)
-            elif name == 'news_catalyst':
-                pred = self.news_agent.predict([symbol])
             else:
-                pred = self.twitter_agent.predict([symbol])
+                pred = self.external_vote(name, symbol)
             votes.append((pred['signal'], pred['confidence'], pred['rationale']))
             print(f"  {name:15} → Signal: {pred['signal']} | Conf: {pred['confidence']:.1%} | {pred['rationale']}")
+        return self.combine(votes)
 
+    def predict_batch(self, features):
+        """Ensemble votes for many symbols at once: features holds the latest row per symbol, indexed by symbol"""
+        ml_votes = {name: agent.predict_batch(features) for name, agent in self.specialists.items() if isinstance(agent, Specialist)}
+        results = {}
+        for symbol in features.index:
+            votes = []
+            print(f"\n--- INDIVIDUAL VOTES ({symbol}) ---")
+            for name, agent in self.specialists.items():
+                if isinstance(agent, Specialist):
+                    pred = ml_votes[name][symbol]
+                else:
+                    pred = self.external_vote(name, symbol)
+                votes.append((pred['signal'], pred['confidence'], pred['rationale']))
+                print(f"  {name:15} → Signal: {pred['signal']} | Conf: {pred['confidence']:.1%} | {pred['rationale']}")
+            results[symbol] = self.combine(votes)
+        return results
+
+    def external_vote(self, name, symbol):
+        """News/twitter vote: latest background snapshot when a refresher is attached, else a blocking fetch"""
+        if self.sentiment_refresher is not None:
+            return self.sentiment_refresher.snapshot(name, symbol)
+        if name == 'news_catalyst':
+            return self.news_agent.predict([symbol])
+        return self.twitter_agent.predict([symbol])
+
+    @staticmethod
+    def combine_arrays(signals, confs, buy_fraction=ENSEMBLE_BUY_FRACTION, min_confidence=MIN_CONFIDENCE):
+        """
+        Vectorized combine over many bars: signals/confs are (n_bars, n_agents) arrays.
+        Sums run agent by agent in vote order so results match combine exactly.
+        Returns (final_signal, final_conf, recommend_buy) arrays.
+        """
+        buy_conf = np.zeros(signals.shape[0])
+        total = np.zeros(signals.shape[0])
+        for j in range(signals.shape[1]):
+            buy_conf = buy_conf + np.where(signals[:, j] == 1, confs[:, j], 0.0)
+            total = total + confs[:, j]
+        final_signal = buy_conf > total * buy_fraction
+        with np.errstate(divide='ignore', invalid='ignore'):
+            final_conf = np.where(total > 0, buy_conf / total, 0.0)
+        return final_signal.astype(int), final_conf, final_signal & (final_conf >= min_confidence)
+
+    def combine(self, votes):
+        """Confidence-weighted vote over (signal, confidence, rationale) tuples"""
         buy_conf = sum(w for s, w, r in votes if s == 1)
         total = sum(w for _, w, _ in votes)
-        final_signal = 1 if buy_conf > total * 0.25 else 0   # LOWERED for dynamic testing
+        final_signal = 1 if buy_conf > total * ENSEMBLE_BUY_FRACTION else 0
         final_conf = buy_conf / total if total > 0 else 0
 
         logger.info(f"🤖 ENSEMBLE → {'BUY' if final_signal else 'HOLD'} ({final_conf:.1%}) | {len([v for v,_,_ in votes if v==1])}/7 specialists agree")
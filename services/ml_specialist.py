@@ -1,18 +1,20 @@
 # services/ml_specialist.py
 from config import *
-import json
+from knowledge_base import knowledge_base
 from datetime import datetime
 import pandas as pd
 import glob
 
 class Specialist:
-    def __init__(self, name, config):
+    def __init__(self, name, config, load_model=True):
         self.name = name
         self.config = config
         self.model = None
         self.scaler = None
         self.feature_columns = None
-        self.load_latest_model()
+        self.n_jobs = 1
+        if load_model:
+            self.load_latest_model()
 
     def load_latest_model(self):
         model_files = sorted(glob.glob(str(MODELS_DIR / f"specialist_{self.name}_*.pkl")), reverse=True)
@@ -26,49 +28,78 @@ class Specialist:
 
     def train(self, df):
         logger.info(f"🔬 Training {self.config['name']}...")
+        X_test, y_test = self.fit(df)
+        self._update_knowledge(df, X_test, y_test)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M")
+        joblib.dump(self.model, MODELS_DIR / f"specialist_{self.name}_{timestamp}.pkl")
+        joblib.dump(self.scaler, MODELS_DIR / f"specialist_scaler_{self.name}_{timestamp}.pkl")
+        joblib.dump(self.feature_columns, MODELS_DIR / f"specialist_features_{self.name}_{timestamp}.pkl")
+
+    def fit(self, df, test_size=TRAIN_TEST_SPLIT):
+        """
+        Fit model + scaler on df in memory (no files, no knowledge base).
+        Returns the held-out (X_test, y_test); with test_size=None the whole frame is used for training.
+        """
         from ml_trainer import MLTrainer
-        trainer = MLTrainer()
+        trainer = MLTrainer(n_jobs=self.n_jobs)
         feature_cols = [f for f in self.config['features'] if f in df.columns]
         X = df[feature_cols]
         y = df['Target']
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TRAIN_TEST_SPLIT, random_state=42, stratify=y)
+        if test_size:
+            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42, stratify=y)
+        else:
+            X_train, X_test, y_train, y_test = X, X.iloc[:0], y, y.iloc[:0]
         trainer.scaler.fit(X_train)
         X_train_s = trainer.scaler.transform(X_train)
-        if self.config['model_type'] == 'gradient_boosting':
-            self.model = trainer.train_gradient_boosting(X_train_s, y_train)
-        else:
-            self.model = trainer.train_random_forest(X_train_s, y_train)
+        self.model = trainer.train_model(self.config['model_type'], X_train_s, y_train)
         self.scaler = trainer.scaler
         self.feature_columns = feature_cols
-        self._update_knowledge(df, X_test, y_test)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-        joblib.dump(self.model, MODELS_DIR / f"specialist_{self.name}_{timestamp}.pkl")
-        joblib.dump(self.scaler, MODELS_DIR / f"specialist_scaler_{self.name}_{timestamp}.pkl")
-        joblib.dump(self.feature_columns, MODELS_DIR / f"specialist_features_{self.name}_{timestamp}.pkl")
+        return X_test, y_test
 
     def _update_knowledge(self, df, X_test, y_test):
-        importances = pd.Series(self.model.feature_importances_, index=self.feature_columns).sort_values(ascending=False)
+        X_test_s = self.scaler.transform(X_test)
+        if hasattr(self.model, 'feature_importances_'):
+            importances = self.model.feature_importances_
+        else:   # e.g. HistGradientBoostingClassifier
+            from sklearn.inspection import permutation_importance
+            importances = permutation_importance(self.model, X_test_s, y_test, n_repeats=5, random_state=42).importances_mean
+        importances = pd.Series(importances, index=self.feature_columns).sort_values(ascending=False)
         entry = {
             "date": datetime.now(TIMEZONE).isoformat(),
             "specialist": self.name,
-            "top_features": importances.head(5).to_dict(),
-            "test_accuracy": (self.model.predict(self.scaler.transform(X_test)) == y_test).mean(),
+            "top_features": {k: float(v) for k, v in importances.head(5).items()},
+            "test_accuracy": float((self.model.predict(X_test_s) == y_test).mean()),
             "insight": f"Strongest signal: {importances.index[0]}"
         }
-        kb = json.load(open(KNOWLEDGE_BASE)) if KNOWLEDGE_BASE.exists() else []
-        kb.append(entry)
-        with open(KNOWLEDGE_BASE, 'w') as f:
-            json.dump(kb[-1000:], f, indent=2)
+        knowledge_base.append(entry)
         logger.info(f"📚 {self.config['name']} added insight")
 
     def predict(self, features_df):
         if self.model is None:
             return {"specialist": self.name, "signal": 0, "confidence": 0.0, "rationale": "Model not loaded"}
-        X_df = features_df[self.feature_columns].iloc[-1:]
+        signals, confs = self._score(features_df[self.feature_columns].iloc[-1:])
+        return self._vote(signals[0], confs[0])
+
+    def predict_batch(self, features):
+        """Score one feature row per symbol (DataFrame indexed by symbol) with one transform + predict_proba"""
+        if self.model is None:
+            return {symbol: {"specialist": self.name, "signal": 0, "confidence": 0.0, "rationale": "Model not loaded"} for symbol in features.index}
+        signals, confs = self._score(features[self.feature_columns])
+        return {symbol: self._vote(signal, conf) for symbol, signal, conf in zip(features.index, signals, confs)}
+
+    def predict_arrays(self, features):
+        """(signals, confidences) for every row of features in one call; zeros when no model is loaded"""
+        if self.model is None:
+            return np.zeros(len(features), dtype=int), np.zeros(len(features))
+        return self._score(features[self.feature_columns])
+
+    def _score(self, X_df):
         X_s = self.scaler.transform(X_df)
-        signal = self.model.predict(X_s)[0]
-        proba = self.model.predict_proba(X_s)[0]
-        conf = proba[1] if signal == 1 else proba[0]
+        proba = self.model.predict_proba(X_s)
+        best = proba.argmax(axis=1)
+        return self.model.classes_[best], proba[np.arange(len(best)), best]
+
+    def _vote(self, signal, conf):
         return {
             "specialist": self.name,
             "signal": int(signal),
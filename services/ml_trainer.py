@@ -1,28 +1,119 @@
 # ml_trainer.py
 from config import *
 import glob
+import multiprocessing
+import os
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+import time
+from threadpoolctl import threadpool_limits
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="sklearn.utils.parallel")
 
+def write_training_parquet(df, path):
+    """Write a labeled frame as Parquet: numeric columns as float32 (Target int8), row groups of TRAINING_ROW_GROUP"""
+    numeric = df.select_dtypes(include=['number', 'bool']).columns
+    df = df.astype({c: np.float32 for c in numeric})
+    if 'Target' in df.columns:
+        df['Target'] = df['Target'].astype(np.int8)
+    tmp_path = str(path) + ".tmp"
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path, row_group_size=TRAINING_ROW_GROUP)
+    os.replace(tmp_path, path)
+
+
+_training_df = None
+
+
+def _init_training(df):
+    """Process-pool initializer: receive the training frame once per worker, not once per task"""
+    global _training_df
+    _training_df = df
+
+
+def _train_specialist(name, n_jobs):
+    """Process-pool task: train and save one specialist, return its wall time"""
+    from ml_specialist import Specialist
+    started = time.perf_counter()
+    spec = Specialist(name, SPECIALISTS[name], load_model=False)
+    spec.n_jobs = n_jobs
+    spec.train(_training_df)
+    return time.perf_counter() - started
+
+
 class MLTrainer:
-    def __init__(self):
+    def __init__(self, n_jobs=1):
         self.scaler = StandardScaler()
+        self.n_jobs = n_jobs
+
+    def training_columns(self):
+        """Feature columns any ML specialist uses, plus Target"""
+        features = {f for cfg in SPECIALISTS.values() if cfg['type'] == 'ml' for f in cfg['features']}
+        return sorted(features) + ['Target']
+
+    def training_files(self):
+        """
+        One *_labeled.parquet file per symbol, converting a *_labeled.csv to a Parquet sidecar
+        once (again when the CSV changes). Older builds wrote an identical {symbol}_{strategy}_labeled
+        copy per strategy, so only the newest file for each symbol is used.
+        """
+        newest = {}
+        for path in glob.glob("*_labeled.parquet") + glob.glob("*_labeled.csv"):
+            symbol = os.path.basename(path).split('_')[0]
+            if symbol not in newest or os.path.getmtime(path) > os.path.getmtime(newest[symbol]):
+                newest[symbol] = path
+        files = []
+        for path in newest.values():
+            if path.endswith(".csv"):
+                parquet_path = path[:-len(".csv")] + ".parquet"
+                if not os.path.exists(parquet_path) or os.path.getmtime(parquet_path) < os.path.getmtime(path):
+                    self.convert_csv(path, parquet_path)
+                path = parquet_path
+            files.append(path)
+        return sorted(files)
+
+    def convert_csv(self, csv_path, parquet_path):
+        """Write a labeled CSV as a typed Parquet sidecar (see write_training_parquet)"""
+        df = pd.read_csv(csv_path, index_col=0)
+        write_training_parquet(df.select_dtypes(include=['number', 'bool']), parquet_path)
+        logger.info(f"Converted {csv_path} -> {parquet_path} ({len(df):,} rows)")
+
+    def iter_training_data(self, batch_rows=TRAINING_ROW_GROUP):
+        """
+        Stream the training files as compact frames of at most batch_rows rows, reading
+        only the specialists' columns (float32 features, int8 Target) and each file once.
+        """
+        wanted = self.training_columns()
+        for path in self.training_files():
+            parquet = pq.ParquetFile(path)
+            if parquet.metadata.num_rows == 0:
+                continue
+            columns = [c for c in wanted if c in parquet.schema_arrow.names]
+            if 'Target' not in columns:
+                logger.warning(f"{path} has no Target column, skipping")
+                continue
+            for batch in parquet.iter_batches(batch_size=batch_rows, columns=columns):
+                df = batch.to_pandas()
+                if df.empty:
+                    continue
+                features = [c for c in columns if c != 'Target']
+                df[features] = df[features].astype(np.float32)
+                df['Target'] = df['Target'].astype(np.int8)
+                yield df.dropna()
 
     def get_training_data(self):
-        csv_files = glob.glob("*_labeled.csv")
-        if not csv_files:
-            logger.warning("No training data found.")
-            return None
-        all_data = [pd.read_csv(f, index_col=0) for f in csv_files if not pd.read_csv(f, index_col=0).empty]
+        all_data = list(self.iter_training_data())
         if not all_data:
+            logger.warning("No training data found.")
             return None
-        combined = pd.concat(all_data, ignore_index=True).dropna()
-        logger.info(f"Combined training data: {len(combined)} samples")
+        combined = pd.concat(all_data, ignore_index=True)
+        logger.info(f"Combined training data: {len(combined)} samples "
+                    f"({combined.memory_usage(index=False).sum() / 1e6:.1f} MB)")
         return combined
 
     def train_random_forest(self, X_train, y_train):
-        model = RandomForestClassifier(n_estimators=200, max_depth=15, random_state=42, n_jobs=1, class_weight='balanced')
+        model = RandomForestClassifier(n_estimators=200, max_depth=15, random_state=42, n_jobs=self.n_jobs, class_weight='balanced')
         model.fit(X_train, y_train)
         return model
 
@@ -31,20 +122,68 @@ class MLTrainer:
         model.fit(X_train, y_train)
         return model
 
-    def train_all_specialists(self):
+    def schedule(self, workers=None):
+        """
+        Plan a parallel run: [(name, n_jobs)] longest jobs first, plus the pool size.
+        Plain gradient boosting is single-threaded, so the multi-threaded models share the cores it leaves free.
+        """
+        names = [name for name, cfg in SPECIALISTS.items() if cfg['type'] == 'ml']
+        cores = os.cpu_count() or 1
+        workers = max(1, min(len(names), workers or TRAIN_WORKERS or cores))
+        boosted = [n for n in names if SPECIALISTS[n]['model_type'] == 'gradient_boosting']
+        threaded = [n for n in names if n not in boosted]
+        threaded_jobs = max(1, (cores - min(len(boosted), workers)) // max(1, min(len(threaded), workers)))
+        return [(n, 1) for n in boosted] + [(n, threaded_jobs) for n in threaded], workers
+
+    def train_hist_gradient_boosting(self, X_train, y_train):
+        model = HistGradientBoostingClassifier(max_iter=200, learning_rate=0.05, max_depth=5, random_state=42)
+        with threadpool_limits(limits=self.n_jobs, user_api='openmp'):
+            model.fit(X_train, y_train)
+        return model
+
+    def train_xgboost(self, X_train, y_train):
+        if not XGBOOST_AVAILABLE:
+            logger.warning("xgboost not installed, using hist_gradient_boosting")
+            return self.train_hist_gradient_boosting(X_train, y_train)
+        model = XGBClassifier(n_estimators=200, learning_rate=0.05, max_depth=5, tree_method='hist',
+                              random_state=42, n_jobs=self.n_jobs)
+        model.fit(X_train, y_train)
+        return model
+
+    def train_model(self, model_type, X_train, y_train):
+        """Dispatch on a SPECIALISTS model_type (unknown types train a random forest)"""
+        trainers = {
+            'gradient_boosting': self.train_gradient_boosting,
+            'hist_gradient_boosting': self.train_hist_gradient_boosting,
+            'xgboost': self.train_xgboost,
+        }
+        return trainers.get(model_type, self.train_random_forest)(X_train, y_train)
+
+    def train_all_specialists(self, workers=None):
+        """Train every ML specialist concurrently in a process pool; logs per-specialist wall time"""
         logger.info("🚀 Training ALL 7 specialist agents...")
         df = self.get_training_data()
         if df is None or len(df) < 100:
             logger.error("Not enough training data")
             return False
-        from ml_specialist import Specialist
-        from ml_ensemble import EnsembleCoordinator
-        ensemble = EnsembleCoordinator()
-        for name, spec in ensemble.specialists.items():
-            if hasattr(spec, 'train'):
-                spec.train(df)
-        logger.info("✅ All specialists trained. Knowledge base updated.")
-        return True
+        plan, workers = self.schedule(workers)
+        started = time.perf_counter()
+        timings = {}
+        # spawn: workers must not fork a parent holding BLAS/OpenMP thread pools
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_training, initargs=(df,)) as pool:
+            futures = {pool.submit(_train_specialist, name, n_jobs): name for name, n_jobs in plan}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    timings[name] = future.result()
+                    logger.info(f"⏱️ {SPECIALISTS[name]['name']} trained in {timings[name]:.1f}s")
+                except Exception as e:
+                    logger.error(f"Training {name} failed: {e}")
+        elapsed = time.perf_counter() - started
+        logger.info(f"✅ {len(timings)}/{len(plan)} specialists trained in {elapsed:.1f}s "
+                    f"({sum(timings.values()):.1f}s sequential, {workers} workers). Knowledge base updated.")
+        return len(timings) == len(plan)
 
 if __name__ == "__main__":
     trainer = MLTrainer()
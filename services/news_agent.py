@@ -4,22 +4,79 @@ import feedparser
 import yfinance as yf
 from textblob import TextBlob
 import json
+import hashlib
+from collections import OrderedDict
+import threading
+import time
 from datetime import datetime
 
+NEWS_FEEDS = ["https://www.cnbc.com/id/100003114/device/rss/rss.html", "https://feeds.reuters.com/reuters/businessNews"]
+
+
+class HeadlineCache:
+    """
+    Process-wide RSS headline cache.
+    Each feed is re-requested at most once per TTL, and then with a conditional
+    GET (ETag / Last-Modified) so an unchanged feed costs a 304 and no parsing.
+    Headline sentiment is memoized by title hash in an LRU of max_sentiments entries.
+    """
+
+    def __init__(self, ttl=NEWS_CACHE_TTL_SECONDS, max_sentiments=NEWS_SENTIMENT_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_sentiments = max_sentiments
+        self.feeds = {}
+        self.sentiments = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_titles(self, url):
+        with self.lock:
+            entry = self.feeds.get(url)
+        if entry and time.monotonic() - entry['fetched_at'] < self.ttl:
+            return entry['titles']
+
+        feed = feedparser.parse(url, etag=entry['etag'] if entry else None, modified=entry['modified'] if entry else None)
+        if entry and (feed.get('status') == 304 or (feed.get('bozo') and not feed.entries)):
+            titles = entry['titles']   # unchanged (or unreachable) - keep what we have
+        else:
+            titles = [e.title for e in feed.entries[:10]]
+        with self.lock:
+            self.feeds[url] = {
+                'fetched_at': time.monotonic(),
+                'etag': feed.get('etag', entry['etag'] if entry else None),
+                'modified': feed.get('modified', entry['modified'] if entry else None),
+                'titles': titles,
+            }
+        return titles
+
+    def sentiment(self, title):
+        key = hashlib.sha1(title.encode('utf-8')).hexdigest()
+        with self.lock:
+            polarity = self.sentiments.get(key)
+            if polarity is not None:
+                self.sentiments.move_to_end(key)
+                return polarity
+        polarity = TextBlob(title).sentiment.polarity
+        with self.lock:
+            self.sentiments[key] = polarity
+            while len(self.sentiments) > self.max_sentiments:
+                self.sentiments.popitem(last=False)
+        return polarity
+
+
+# Global instance shared by every NewsCatalystAgent (live trader, backtester, dashboard)
+headline_cache = HeadlineCache()
+
+
 class NewsCatalystAgent:
-    def __init__(self):
-        pass
+    def __init__(self, cache=None):
+        self.cache = cache or headline_cache
 
     def fetch_market_news(self):
-        feeds = ["https://www.cnbc.com/id/100003114/device/rss/rss.html", "https://feeds.reuters.com/reuters/businessNews"]
         news = []
-        for url in feeds:
+        for url in NEWS_FEEDS:
             try:
-                feed = feedparser.parse(url)
-                for entry in feed.entries[:10]:
-                    title = entry.title
-                    sentiment = TextBlob(title).sentiment.polarity
-                    news.append({"title": title, "sentiment": sentiment})
+                for title in self.cache.get_titles(url):
+                    news.append({"title": title, "sentiment": self.cache.sentiment(title)})
             except:
                 pass
         return news
@@ -35,4 +92,4 @@ class NewsCatalystAgent:
             "signal": final_signal,
             "confidence": float(confidence),
             "rationale": f"News bias {overall_bias:.2f} | Catalysts {catalyst_score:.2f}"
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,110 @@
+# services/param_sweep.py - STRATEGY PARAMETER SWEEP
+# Scores every bar with the specialists ONCE per symbol, then re-runs only the
+# cheap ensemble-combine + trade-simulation layer for each parameter combination.
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import *
+from backtester import Backtester, simulate_trades, RESULTS_DIR
+from build_dataset import compute_features, download_intraday
+from ml_ensemble import EnsembleCoordinator
+from ml_specialist import Specialist
+import itertools
+import random
+import os
+
+DEFAULT_GRID = {
+    'min_confidence': [0.50, 0.55, 0.60, 0.65, 0.70],
+    'buy_fraction': [0.20, 0.25, 0.30, 0.40],
+    'stop_loss_pct': [0.01, 0.02, 0.03],
+    'take_profit_pct': [None, 0.02, 0.04],
+    'lookahead_bars': [3, 5, 10],
+}
+
+
+class ParameterSweep:
+    def __init__(self, backtester=None):
+        self.backtester = backtester or Backtester()
+        self.scored = {}
+
+    def prepare(self, symbols):
+        """Load bars and cache (index, close, signals, confs) per symbol; the only step that calls the models"""
+        ensemble = self.backtester.ensemble
+        for symbol in symbols:
+            df = download_intraday(symbol, strategy='macd_crossover')
+            if df is None or len(df) < 100:
+                continue
+            df = compute_features(df)
+            signals = np.zeros((len(df), len(ensemble.specialists)), dtype=int)
+            confs = np.zeros((len(df), len(ensemble.specialists)))
+            for j, (name, agent) in enumerate(ensemble.specialists.items()):
+                if isinstance(agent, Specialist):
+                    signals[:, j], confs[:, j] = agent.predict_arrays(df)
+                else:
+                    pred = ensemble.external_vote(name, symbol)
+                    signals[:, j] = pred['signal']
+                    confs[:, j] = pred['confidence']
+            self.scored[symbol] = (df.index, df['Close'].to_numpy(dtype=float), signals, confs)
+            logger.info(f"Scored {len(df):,} bars for {symbol}")
+
+    def evaluate(self, params, symbols=None):
+        """Simulate one parameter combination over the prepared symbols (default: all of them)"""
+        lookahead = params.get('lookahead_bars', LOOKAHEAD_BARS)
+        total_pnl = 0.0
+        trades = []
+        scored = self.scored.values() if symbols is None else [self.scored[s] for s in symbols if s in self.scored]
+        for index, close, signals, confs in scored:
+            n = len(close) - lookahead
+            if n <= 50:
+                continue
+            actual_return = close[lookahead:] / close[:n] - 1
+            _, _, recommend_buy = EnsembleCoordinator.combine_arrays(
+                signals[:n], confs[:n],
+                buy_fraction=params.get('buy_fraction', ENSEMBLE_BUY_FRACTION),
+                min_confidence=params.get('min_confidence', MIN_CONFIDENCE))
+            symbol_trades, _, equity = simulate_trades(
+                index[:n], close[:n], recommend_buy, actual_return,
+                stop_loss_pct=params.get('stop_loss_pct', STOP_LOSS_PCT),
+                take_profit_pct=params.get('take_profit_pct'),
+                final_price=close[-1])
+            total_pnl += equity - 100_000
+            trades.extend(symbol_trades)
+        wins = len([t for t in trades if t.get('pnl', 0) > 0])
+        return dict(params, pnl=total_pnl, trades=len(trades), win_rate=wins / len(trades) * 100 if trades else 0)
+
+    def grid(self, param_grid=None):
+        """Every combination of the grid values"""
+        param_grid = param_grid or DEFAULT_GRID
+        keys = list(param_grid)
+        return [dict(zip(keys, values)) for values in itertools.product(*(param_grid[k] for k in keys))]
+
+    def sample(self, param_grid=None, n=50, seed=42):
+        """n random combinations drawn from the grid values"""
+        combos = self.grid(param_grid)
+        return random.Random(seed).sample(combos, min(n, len(combos)))
+
+    def run(self, symbols=None, combos=None):
+        """Evaluate every combination and write a ranked table to sweep_results.csv"""
+        if symbols is None:
+            symbols = ["SPY"]
+        self.prepare([s for s in symbols if s not in self.scored])
+        symbols = [s for s in symbols if s in self.scored]
+        combos = combos or self.grid()
+        logger.info(f"🔎 Sweeping {len(combos)} parameter combinations over {len(symbols)} symbols...")
+        results = pd.DataFrame([self.evaluate(params, symbols) for params in combos])
+        results = results.sort_values(['pnl', 'win_rate'], ascending=False).reset_index(drop=True)
+        results.insert(0, 'rank', range(1, len(results) + 1))
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        results.to_csv(f"{RESULTS_DIR}/sweep_results.csv", index=False)
+        print(results.head(10).to_string(index=False))
+        return results
+
+
+if __name__ == "__main__":
+    sweep = ParameterSweep()
+    if len(sys.argv) > 1 and sys.argv[1] == "--random":
+        sweep.run(symbols=sys.argv[2:] or None, combos=sweep.sample())
+    else:
+        sweep.run(symbols=sys.argv[1:] or None)
@@ -0,0 +1,92 @@
+# services/sentiment_refresher.py
+# Background refresher for the network-bound agents (news + twitter).
+# Keeps per-symbol sentiment snapshots up to date off the trading tick so the
+# ensemble reads the latest vote without blocking on RSS / Nitter.
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import *
+from build_dataset import get_most_active_symbols_with_price_filter
+import threading
+import time
+from datetime import datetime
+
+AGENT_NAMES = {'news': 'news_catalyst', 'twitter': 'twitter_sentiment'}
+
+
+class SentimentRefresher:
+    """Periodically refreshes news/twitter votes for the scan universe in a daemon thread"""
+
+    def __init__(self, news_agent, twitter_agent, symbols_provider=None, interval=SENTIMENT_REFRESH_SECONDS):
+        self.news_agent = news_agent
+        self.twitter_agent = twitter_agent
+        self.symbols_provider = symbols_provider or (lambda: get_most_active_symbols_with_price_filter()[:SCAN_UNIVERSE_SIZE])
+        self.interval = interval
+        self.snapshots = {}
+        self.lock = threading.Lock()
+        self.refresher_thread = None
+        self.should_run = False
+        self._wake = threading.Event()
+
+    def _store(self, name, symbol, pred):
+        with self.lock:
+            self.snapshots[(name, symbol)] = (pred, datetime.now(TIMEZONE))
+
+    def refresh_once(self):
+        """Refresh every snapshot once (runs on the refresher thread)"""
+        symbols = self.symbols_provider()
+        try:
+            # News bias is market-wide: one fetch serves every symbol
+            self._store(AGENT_NAMES['news'], None, self.news_agent.predict(symbols))
+        except Exception as e:
+            logger.warning(f"News refresh failed: {e}")
+        for symbol in symbols:
+            if self._wake.is_set():   # stop() requested
+                break
+            try:
+                self._store(AGENT_NAMES['twitter'], symbol, self.twitter_agent.predict([symbol]))
+            except Exception as e:
+                logger.warning(f"Twitter refresh failed for {symbol}: {e}")
+
+    def snapshot(self, name, symbol):
+        """Latest vote for (agent, symbol) without blocking; includes as_of and age_seconds staleness info"""
+        with self.lock:
+            found = self.snapshots.get((name, symbol)) or self.snapshots.get((name, None))
+        if found is None:
+            return {"specialist": name, "signal": 0, "confidence": 0.0, "rationale": "No snapshot yet", "as_of": None, "age_seconds": None}
+        pred, as_of = found
+        pred = dict(pred)
+        pred['as_of'] = as_of.isoformat()
+        pred['age_seconds'] = (datetime.now(TIMEZONE) - as_of).total_seconds()
+        return pred
+
+    def _refresher_loop(self):
+        logger.info("Sentiment refresher thread started")
+        while self.should_run:
+            started = time.monotonic()
+            try:
+                self.refresh_once()
+            except Exception as e:
+                logger.error(f"Sentiment refresher error: {e}")
+            self._wake.wait(max(0.0, self.interval - (time.monotonic() - started)))
+        logger.info("Sentiment refresher thread stopped")
+
+    def start(self):
+        if self.refresher_thread and self.refresher_thread.is_alive():
+            logger.warning("Sentiment refresher already running")
+            return False
+        self.should_run = True
+        self._wake.clear()
+        self.refresher_thread = threading.Thread(target=self._refresher_loop, daemon=True)
+        self.refresher_thread.start()
+        logger.info(f"Sentiment refresher started (every {self.interval}s)")
+        return True
+
+    def stop(self):
+        self.should_run = False
+        self._wake.set()
+        if self.refresher_thread:
+            self.refresher_thread.join(timeout=5)
+        logger.info("Sentiment refresher stopped")
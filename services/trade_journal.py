@@ -0,0 +1,265 @@
+# trade_journal.py
+# Append-only JSON-lines journal used by TradeLogger for its daily/strategy logs.
+# Each line is one record: {"op": "add", "trade": {...}} or
+# {"op": "update", "id": <order_id>, "changes": {...}}; reads replay them in order.
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import *
+from file_lock import file_lock
+import atexit
+import json
+import os
+import threading
+import time
+
+
+class TradeJournal:
+    """
+    Constant-cost trade writes: a record is appended and flushed to the OS
+    immediately (survives a process crash) and fsync'ed to disk in batches,
+    every `fsync_every` records or `fsync_interval` seconds, whichever comes first.
+    A torn last line left by a crash is skipped on read.
+    Writes hold file_lock(lock_path), so several journals (in this or other processes)
+    can append to the same files and every returned offset is the record's real position.
+    """
+
+    def __init__(self, fsync_every=JOURNAL_FSYNC_EVERY, fsync_interval=JOURNAL_FSYNC_SECONDS, lock_path=TRADE_LOCK_PATH):
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.file_lock = file_lock(lock_path)
+        self.handles = {}
+        self.pending = 0
+        self.last_sync = time.monotonic()
+        self.lock = threading.RLock()
+        atexit.register(self.close)
+
+    def append(self, path, record):
+        """Append one record to the journal at path; returns its byte offset"""
+        line = (json.dumps(record, default=str) + "\n").encode('utf-8')
+        with self.file_lock, self.lock:
+            f = self._handle(path)
+            offset = f.seek(0, os.SEEK_END)   # other writers may have appended since our last write
+            f.write(line)
+            f.flush()
+            self.pending += 1
+            if self.pending >= self.fsync_every or time.monotonic() - self.last_sync >= self.fsync_interval:
+                self.sync()
+        return offset
+
+    def add(self, path, trade):
+        return self.append(path, {"op": "add", "trade": trade})
+
+    def update(self, path, trade_id, changes):
+        return self.append(path, {"op": "update", "id": trade_id, "changes": changes})
+
+    def read_at(self, path, offset):
+        """Read the single record starting at a byte offset returned by append"""
+        with self.lock:
+            f = self.handles.get(Path(path))
+            if f is not None:
+                f.flush()
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def sync(self):
+        """fsync every open journal"""
+        with self.lock:
+            for f in self.handles.values():
+                os.fsync(f.fileno())
+            self.pending = 0
+            self.last_sync = time.monotonic()
+
+    def close(self, path=None):
+        """Sync and close one journal (or all of them)"""
+        with self.lock:
+            paths = [Path(path)] if path is not None else list(self.handles)
+            for p in paths:
+                f = self.handles.pop(p, None)
+                if f is not None:
+                    f.flush()
+                    os.fsync(f.fileno())
+                    f.close()
+
+    def _handle(self, path):
+        path = Path(path)
+        f = self.handles.get(path)
+        if f is not None and self._replaced(path, f):
+            f.close()   # compacted/rewritten by another writer: append to the new file
+            del self.handles[path]
+            f = None
+        if f is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            torn = False
+            if path.exists() and path.stat().st_size > 0:
+                with open(path, 'rb') as existing:
+                    existing.seek(-1, os.SEEK_END)
+                    torn = existing.read(1) != b"\n"
+            f = open(path, 'ab')
+            if torn:
+                f.write(b"\n")   # terminate a line torn by a crash so the next record stays readable
+            self.handles[path] = f
+        return f
+
+    def _replaced(self, path, f):
+        try:
+            return os.fstat(f.fileno()).st_ino != path.stat().st_ino
+        except FileNotFoundError:
+            return True
+
+    def records(self, path):
+        """Yield the raw records of a journal, skipping a torn trailing line"""
+        path = Path(path)
+        if not path.exists():
+            return
+        with self.lock:
+            f = self.handles.get(path)
+            if f is not None:
+                f.flush()
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping unreadable journal line {line_no} in {path.name}")
+
+    def read(self, path, legacy_path=None):
+        """Replay a journal into its current list of trades (falls back to a legacy JSON log)"""
+        path = Path(path)
+        if not path.exists():
+            if legacy_path is not None and Path(legacy_path).exists():
+                with open(legacy_path, 'r') as f:
+                    return json.load(f).get('trades', [])
+            return []
+
+        trades = []
+        for record in self.records(path):
+            if record.get('op') == 'add':
+                trades.append(record['trade'])
+            elif record.get('op') == 'update':
+                for trade in reversed(trades):   # newest add with this id, as OrderIndex/SQLite resolve it
+                    if trade.get('order_id') == record['id'] or trade.get('id') == record['id']:
+                        trade.update(record['changes'])
+                        break
+        return trades
+
+    def compact(self, path):
+        """
+        Rewrite a journal as plain 'add' records with all updates applied (atomic replace).
+        Returns [(trade, new_offset)] so callers can re-point any offset index.
+        """
+        path = Path(path)
+        if not path.exists():
+            return []
+        with self.file_lock, self.lock:
+            trades = self.read(path)
+            self.close(path)
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            compacted = []
+            with open(tmp, 'wb') as f:
+                for trade in trades:
+                    compacted.append((trade, f.tell()))
+                    f.write((json.dumps({"op": "add", "trade": trade}, default=str) + "\n").encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+            tmp.replace(path)
+        return compacted
+
+
+class OrderIndex:
+    """
+    Persistent order_id -> (date, strategy, offsets) index over the daily journals.
+    offsets are the byte positions of the trade's add/update records in its daily
+    journal, so a lookup reads only those lines. The index file is itself an
+    append-only journal of {"id", "date", "strategy", "offset"} entries, loaded
+    once at startup; entries other writers append later are read on the next lookup.
+    """
+
+    def __init__(self, path, journal):
+        self.path = Path(path)
+        self.journal = journal
+        self.entries = {}
+        self.offset = 0
+        self.inode = None
+        self._refresh()
+
+    def exists(self):
+        return self.path.exists()
+
+    def _refresh(self):
+        """Apply index lines appended since the last read (reload if the file was rewritten)"""
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            self.entries = {}
+            self.offset = 0
+            self.inode = st.st_ino
+        if st.st_size == self.offset:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break   # partial line still being written
+                self.offset += len(line)
+                try:
+                    self._apply(json.loads(line))
+                except (json.JSONDecodeError, KeyError):
+                    logger.warning(f"Skipping unreadable line in {self.path.name}")
+
+    def _apply(self, record):
+        entry = self.entries.get(record['id'])
+        if entry is None or record.get('reset'):
+            entry = self.entries[record['id']] = {'date': record['date'], 'strategy': record.get('strategy'), 'offsets': []}
+        entry['offsets'].append(record['offset'])
+
+    def add(self, trade_id, date, strategy, offset, reset=False):
+        """Record where a trade's add (reset=True starts a new trade) or update record was written"""
+        record = {'id': trade_id, 'date': str(date), 'strategy': strategy, 'offset': offset}
+        if reset:
+            record['reset'] = True
+        with self.journal.file_lock:
+            self.journal.append(self.path, record)
+            self._refresh()
+
+    def get(self, trade_id):
+        self._refresh()
+        return self.entries.get(trade_id)
+
+    def replace_date(self, date, compacted):
+        """Re-point every trade of a compacted daily journal and rewrite the index file"""
+        date = str(date)
+        with self.journal.file_lock:
+            self._refresh()
+            for trade_id in [k for k, v in self.entries.items() if v['date'] == date]:
+                del self.entries[trade_id]
+            for trade, offset in compacted:
+                trade_id = trade.get('order_id') or trade.get('id')
+                if trade_id is not None:
+                    self.entries[trade_id] = {'date': date, 'strategy': trade.get('strategy'), 'offsets': [offset]}
+            self.rewrite()
+
+    def rewrite(self):
+        """Write the in-memory index back out as one entry per record (atomic replace)"""
+        with self.journal.file_lock, self.journal.lock:
+            self.journal.close(self.path)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp, 'wb') as f:
+                for trade_id, entry in self.entries.items():
+                    for i, offset in enumerate(entry['offsets']):
+                        record = {'id': trade_id, 'date': entry['date'], 'strategy': entry['strategy'], 'offset': offset}
+                        if i == 0:
+                            record['reset'] = True
+                        f.write((json.dumps(record, default=str) + "\n").encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+                size = f.tell()
+            tmp.replace(self.path)
+            self.inode, self.offset = self.path.stat().st_ino, size
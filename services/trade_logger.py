@@ -7,6 +7,9 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config import *
+from trade_journal import TradeJournal, OrderIndex
+from trade_store import SQLiteTradeStore
+from trade_rollups import TradeRollups
 import json
 from datetime import datetime, timedelta
 
@@ -15,13 +18,41 @@ class TradeLogger:
     """
     Logs all trades with strategy, entry/exit, P&L, and metadata.
     Organizes trades by date for easy historical lookup.
+    Storage backend (TRADE_STORE_BACKEND):
+      journal - append-only JSON-lines files per day/strategy (see TradeJournal);
+                legacy *_trades.json files are still read
+      sqlite  - indexed SQLite table (see SQLiteTradeStore); existing day logs
+                are imported on first use
     """
     
-    def __init__(self):
+    def __init__(self, journal=None, backend=TRADE_STORE_BACKEND):
         self.logs_dir = LOGS_DIR
         self.strategy_logs_dir = STRATEGY_LOGS_DIR
+        self.journal = journal or TradeJournal()
         self.today = datetime.now(tz=TIMEZONE).date()
         self.current_day_log = self.get_today_log()
+        self.store = None
+        self.order_index = None
+        self.rollups = TradeRollups(lambda date: self.get_daily_trades(date).get('trades', []), ROLLUPS_DIR, self.journal.file_lock.path)
+        if backend == 'sqlite':
+            self.store = SQLiteTradeStore()
+            self.store.migrate_from_logs(self.logs_dir, lambda date: self._read_log(self.logs_dir / self.get_log_filename(date)))
+        else:
+            with self.journal.file_lock:
+                self.order_index = OrderIndex(ORDER_INDEX_PATH, self.journal)
+                if not self.order_index.exists():
+                    self.rebuild_order_index()
+            self.compact_previous_days()
+    
+    def _check_day(self):
+        """Move to a new day's logs after midnight, compacting the days just finished"""
+        today = datetime.now(tz=TIMEZONE).date()
+        if today == self.today:
+            return
+        self.today = today
+        self.current_day_log = self.get_today_log()
+        if self.store is None:
+            self.compact_previous_days()
     
     def get_log_filename(self, date=None):
         """Get the log filename for a specific date (YYYY-MM-DD format)"""
@@ -29,8 +60,8 @@ class TradeLogger:
             date = self.today
         
         if isinstance(date, str):
-            return f"{date}_trades.json"
-        return f"{date.strftime('%Y-%m-%d')}_trades.json"
+            return f"{date}_trades.jsonl"
+        return f"{date.strftime('%Y-%m-%d')}_trades.jsonl"
     
     def get_strategy_log_filename(self, strategy, date=None):
         """Get strategy-specific log filename"""
@@ -38,8 +69,8 @@ class TradeLogger:
             date = self.today
         
         if isinstance(date, str):
-            return f"{strategy}_{date}_trades.json"
-        return f"{strategy}_{date.strftime('%Y-%m-%d')}_trades.json"
+            return f"{strategy}_{date}_trades.jsonl"
+        return f"{strategy}_{date.strftime('%Y-%m-%d')}_trades.jsonl"
     
     def get_today_log(self):
         """Get path to today's trade log"""
@@ -82,14 +113,28 @@ class TradeLogger:
             if 'timestamp' not in trade_data:
                 trade_data['timestamp'] = datetime.now(tz=TIMEZONE).isoformat()
             
-            # Log to daily log
-            self._append_to_log(self.get_today_log(), trade_data)
+            # The trade's own strategy decides which strategy log (and rollup) holds it
+            strategy = trade_data.setdefault('strategy', strategy)
             
-            # Log to strategy-specific log
-            self._append_to_log(
-                self.get_strategy_today_log(strategy),
-                trade_data
-            )
+            self._check_day()
+            if self.store is not None:
+                self.store.add_trade(self.today, trade_data)
+                self.rollups.apply(self.today, None, trade_data)
+                logger.info(f"Trade logged: {trade_data['symbol']} {trade_data['side']} @ {trade_data['entry_price']}")
+                return True
+            
+            # One writer at a time (other TradeLoggers/processes) across the logs, index and rollups
+            with self.journal.file_lock:
+                # Log to daily log
+                offset = self._append_to_log(self.get_today_log(), trade_data)
+                self._index_trade(trade_data, self.today, strategy, offset)
+                
+                # Log to strategy-specific log
+                self._append_to_log(
+                    self.get_strategy_today_log(strategy),
+                    trade_data
+                )
+                self.rollups.apply(self.today, None, trade_data)
             
             logger.info(f"Trade logged: {trade_data['symbol']} {trade_data['side']} @ {trade_data['entry_price']}")
             return True
@@ -99,31 +144,75 @@ class TradeLogger:
             return False
     
     def _append_to_log(self, log_path, trade_data):
-        """Append trade to a JSON log file"""
+        """Append trade to a JSON-lines journal (constant cost regardless of log size)"""
         try:
-            # Load existing trades
-            if log_path.exists():
-                with open(log_path, 'r') as f:
-                    data = json.load(f)
-                    trades = data.get('trades', [])
-            else:
-                trades = []
-            
-            # Append new trade
-            trades.append(trade_data)
-            
-            # Save updated log
-            log_data = {
-                'date': str(self.today),
-                'total_trades': len(trades),
-                'trades': trades
-            }
-            
-            with open(log_path, 'w') as f:
-                json.dump(log_data, f, indent=2)
-        
+            return self.journal.add(log_path, trade_data)
         except Exception as e:
             logger.error(f"Error appending to log {log_path}: {e}")
+            return None
+    
+    def _index_trade(self, trade, date, strategy, offset):
+        """Point the order_id index at a trade's add record in its daily journal"""
+        trade_id = trade.get('order_id') or trade.get('id')
+        if trade_id is not None and offset is not None:
+            self.order_index.add(trade_id, date, strategy, offset, reset=True)
+    
+    def _read_log(self, log_path):
+        """Replay a journal (or legacy JSON log) into its list of trades"""
+        return self.journal.read(log_path, legacy_path=log_path.with_suffix('.json'))
+    
+    def _ensure_journal(self, log_path):
+        """Convert a legacy JSON log into a journal before appending records to it"""
+        legacy_path = log_path.with_suffix('.json')
+        if log_path.exists() or not legacy_path.exists():
+            return
+        is_daily = log_path.parent == self.logs_dir
+        for trade in self.journal.read(log_path, legacy_path=legacy_path):
+            offset = self.journal.add(log_path, trade)
+            if is_daily:
+                self._index_trade(trade, log_path.name.split('_trades')[0], trade.get('strategy'), offset)
+    
+    def rebuild_order_index(self):
+        """Index every trade in the daily journals (run once when the index file is missing)"""
+        count = 0
+        for log_path in sorted(self.logs_dir.glob('*_trades.jsonl')):
+            date = log_path.name.split('_trades')[0]
+            offset = 0
+            with open(log_path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        record = {}
+                    trade_id = record.get('id')
+                    if record.get('op') == 'add':
+                        trade = record['trade']
+                        trade_id = trade.get('order_id') or trade.get('id')
+                        if trade_id is not None:
+                            self.order_index.add(trade_id, date, trade.get('strategy'), offset, reset=True)
+                            count += 1
+                    elif record.get('op') == 'update' and self.order_index.get(trade_id):
+                        self.order_index.add(trade_id, date, self.order_index.get(trade_id)['strategy'], offset)
+                    offset += len(line)
+        if count:
+            logger.info(f"Indexed {count} trades by order_id")
+    
+    def get_trade(self, trade_id):
+        """Look up one trade (with its updates applied) by order_id across the full history"""
+        if self.store is not None:
+            return self.store.get_trade(trade_id)
+        entry = self.order_index.get(trade_id)
+        if entry is None:
+            return None
+        log_path = self.logs_dir / self.get_log_filename(entry['date'])
+        trade = None
+        for offset in entry['offsets']:
+            record = self.journal.read_at(log_path, offset)
+            if record.get('op') == 'add':
+                trade = dict(record['trade'])
+            elif trade is not None:
+                trade.update(record['changes'])
+        return trade
     
     def get_daily_trades(self, date=None):
         """Retrieve all trades for a specific date"""
@@ -133,18 +222,16 @@ class TradeLogger:
         if isinstance(date, str):
             date = datetime.strptime(date, '%Y-%m-%d').date()
         
-        log_path = self.logs_dir / self.get_log_filename(date)
-        
-        if not log_path.exists():
+        try:
+            if self.store is not None:
+                trades = self.store.query_trades(start_date=date, end_date=date)
+            else:
+                trades = self._read_log(self.logs_dir / self.get_log_filename(date))
             return {
                 'date': str(date),
-                'total_trades': 0,
-                'trades': []
+                'total_trades': len(trades),
+                'trades': trades
             }
-        
-        try:
-            with open(log_path, 'r') as f:
-                return json.load(f)
         except Exception as e:
             logger.error(f"Failed to read trades for {date}: {e}")
             return {'date': str(date), 'total_trades': 0, 'trades': []}
@@ -157,19 +244,17 @@ class TradeLogger:
         if isinstance(date, str):
             date = datetime.strptime(date, '%Y-%m-%d').date()
         
-        log_path = self.strategy_logs_dir / self.get_strategy_log_filename(strategy, date)
-        
-        if not log_path.exists():
+        try:
+            if self.store is not None:
+                trades = self.store.query_trades(start_date=date, end_date=date, strategy=strategy)
+            else:
+                trades = self._read_log(self.strategy_logs_dir / self.get_strategy_log_filename(strategy, date))
             return {
                 'strategy': strategy,
                 'date': str(date),
-                'total_trades': 0,
-                'trades': []
+                'total_trades': len(trades),
+                'trades': trades
             }
-        
-        try:
-            with open(log_path, 'r') as f:
-                return json.load(f)
         except Exception as e:
             logger.error(f"Failed to read {strategy} trades for {date}: {e}")
             return {'strategy': strategy, 'date': str(date), 'total_trades': 0, 'trades': []}
@@ -184,13 +269,16 @@ class TradeLogger:
         if isinstance(end_date, str):
             end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
         
-        all_trades = []
-        current = start_date
-        
-        while current <= end_date:
-            daily_data = self.get_daily_trades(current)
-            all_trades.extend(daily_data.get('trades', []))
-            current += timedelta(days=1)
+        if self.store is not None:
+            all_trades = self.store.query_trades(start_date=start_date, end_date=end_date)
+        else:
+            all_trades = []
+            current = start_date
+            
+            while current <= end_date:
+                daily_data = self.get_daily_trades(current)
+                all_trades.extend(daily_data.get('trades', []))
+                current += timedelta(days=1)
         
         return {
             'start_date': str(start_date),
@@ -201,70 +289,90 @@ class TradeLogger:
     
     def get_available_dates(self):
         """Get list of dates with trade logs"""
-        dates = []
+        if self.store is not None:
+            return self.store.available_dates()
         
-        for log_file in sorted(self.logs_dir.glob('*_trades.json')):
-            try:
-                # Extract date from filename (YYYY-MM-DD format)
-                date_str = log_file.stem.replace('_trades', '')
-                dates.append(date_str)
-            except:
-                pass
+        dates = set()
+        
+        for log_file in self.logs_dir.glob('*_trades.json*'):
+            if log_file.suffix not in ('.json', '.jsonl'):
+                continue
+            # Extract date from filename (YYYY-MM-DD format)
+            dates.add(log_file.stem.replace('_trades', ''))
         
         return sorted(dates, reverse=True)  # Most recent first
     
+    def query_trades(self, start_date=None, end_date=None, symbol=None, status=None, strategy=None):
+        """All trades matching the given filters (indexed SQL with the sqlite backend)"""
+        if self.store is not None:
+            return self.store.query_trades(start_date=start_date, end_date=end_date,
+                                           symbol=symbol, strategy=strategy, status=status)
+        return list(self.iter_trades(start_date, end_date, symbol=symbol, status=status, strategy=strategy))
+    
+    def iter_trades(self, start_date=None, end_date=None, symbol=None, status=None, strategy=None, newest_first=False):
+        """
+        Yield matching trades oldest first (or newest first) without materializing the range:
+        one day's journal at a time, or a streaming cursor with the sqlite backend.
+        """
+        if self.store is not None:
+            yield from self.store.iter_trades(start_date=start_date, end_date=end_date, symbol=symbol,
+                                              strategy=strategy, status=status, newest_first=newest_first)
+            return
+        
+        dates = sorted(self.get_available_dates(), reverse=newest_first)
+        if start_date is not None:
+            dates = [d for d in dates if d >= str(start_date)]
+        if end_date is not None:
+            dates = [d for d in dates if d <= str(end_date)]
+        
+        for date in dates:
+            trades = self.get_daily_trades(date).get('trades', [])
+            for trade in (reversed(trades) if newest_first else trades):
+                if symbol and trade.get('symbol') != symbol:
+                    continue
+                if status and trade.get('status') != status:
+                    continue
+                if strategy and trade.get('strategy') != strategy:
+                    continue
+                yield trade
+    
+    def _format_statistics(self, stats):
+        closed = stats['closed_trades']
+        total_pnl = stats['total_pnl']
+        return {
+            'total_trades': stats['total_trades'],
+            'closed_trades': closed,
+            'open_trades': stats['open_trades'],
+            'winning_trades': stats['winning_trades'],
+            'losing_trades': stats['losing_trades'],
+            'total_pnl': round(total_pnl, 2),
+            'avg_pnl': round(total_pnl / closed, 2) if closed else 0,
+            'win_rate': round(stats['winning_trades'] / closed * 100, 2) if closed else 0,
+            'best_trade': stats['best_trade'],
+            'worst_trade': stats['worst_trade']
+        }
+    
     def get_daily_statistics(self, date=None):
-        """Calculate statistics for a specific day"""
+        """Statistics for a specific day (read from its rollup, not raw trades)"""
         if date is None:
             date = self.today
         
-        data = self.get_daily_trades(date)
-        trades = data.get('trades', [])
-        
-        if not trades:
-            return {
-                'date': str(date),
-                'total_trades': 0,
-                'closed_trades': 0,
-                'open_trades': 0,
-                'winning_trades': 0,
-                'losing_trades': 0,
-                'total_pnl': 0,
-                'avg_pnl': 0,
-                'win_rate': 0,
-                'best_trade': None,
-                'worst_trade': None
-            }
-        
-        closed_trades = [t for t in trades if t.get('status') == 'CLOSED']
-        winning = [t for t in closed_trades if t.get('pnl_amount', 0) > 0]
-        losing = [t for t in closed_trades if t.get('pnl_amount', 0) < 0]
-        
-        total_pnl = sum(t.get('pnl_amount', 0) for t in closed_trades)
-        
-        return {
-            'date': str(date),
-            'total_trades': len(trades),
-            'closed_trades': len(closed_trades),
-            'open_trades': len([t for t in trades if t.get('status') == 'OPEN']),
-            'winning_trades': len(winning),
-            'losing_trades': len(losing),
-            'total_pnl': round(total_pnl, 2),
-            'avg_pnl': round(total_pnl / len(closed_trades), 2) if closed_trades else 0,
-            'win_rate': round(len(winning) / len(closed_trades) * 100, 2) if closed_trades else 0,
-            'best_trade': max(closed_trades, key=lambda t: t.get('pnl_amount', 0)) if closed_trades else None,
-            'worst_trade': min(closed_trades, key=lambda t: t.get('pnl_amount', 0)) if closed_trades else None
+        rollup = self.rollups.get(date)
+        stats = {'date': str(date)}
+        stats.update(self._format_statistics(rollup['all']))
+        stats['by_strategy'] = {
+            strategy: dict(self._format_statistics(s), strategy=strategy, date=str(date))
+            for strategy, s in rollup['by_strategy'].items()
         }
+        return stats
     
     def get_strategy_statistics(self, strategy, date=None):
-        """Calculate statistics for a specific strategy on a specific day"""
+        """Statistics for a specific strategy on a specific day (from the day's rollup)"""
         if date is None:
             date = self.today
         
-        data = self.get_strategy_daily_trades(strategy, date)
-        trades = data.get('trades', [])
-        
-        if not trades:
+        stats = self.rollups.get(date)['by_strategy'].get(strategy)
+        if not stats:
             return {
                 'strategy': strategy,
                 'date': str(date),
@@ -274,117 +382,237 @@ class TradeLogger:
                 'win_rate': 0
             }
         
-        closed_trades = [t for t in trades if t.get('status') == 'CLOSED']
-        winning = [t for t in closed_trades if t.get('pnl_amount', 0) > 0]
-        
-        total_pnl = sum(t.get('pnl_amount', 0) for t in closed_trades)
-        
+        formatted = self._format_statistics(stats)
         return {
             'strategy': strategy,
             'date': str(date),
-            'total_trades': len(trades),
-            'closed_trades': len(closed_trades),
-            'winning_trades': len(winning),
-            'total_pnl': round(total_pnl, 2),
-            'avg_pnl': round(total_pnl / len(closed_trades), 2) if closed_trades else 0,
-            'win_rate': round(len(winning) / len(closed_trades) * 100, 2) if closed_trades else 0
+            'total_trades': formatted['total_trades'],
+            'closed_trades': formatted['closed_trades'],
+            'winning_trades': formatted['winning_trades'],
+            'total_pnl': formatted['total_pnl'],
+            'avg_pnl': formatted['avg_pnl'],
+            'win_rate': formatted['win_rate']
+        }
+    
+    def get_period_statistics(self, start_date=None, end_date=None, strategy=None):
+        """Statistics over a date range (default: all time), merged from daily rollups"""
+        dates = sorted(self.get_available_dates())
+        if start_date is not None:
+            dates = [d for d in dates if d >= str(start_date)]
+        if end_date is not None:
+            dates = [d for d in dates if d <= str(end_date)]
+        
+        stats = {
+            'start_date': str(start_date) if start_date is not None else (dates[0] if dates else None),
+            'end_date': str(end_date) if end_date is not None else (dates[-1] if dates else None),
+            'days': len(dates)
         }
+        if strategy:
+            stats['strategy'] = strategy
+        stats.update(self._format_statistics(self.rollups.summarize(dates, strategy)))
+        return stats
+    
+    def get_summary(self, period='week', strategy=None):
+        """Statistics for the current 'week', 'month' or 'all' time"""
+        if period == 'week':
+            start = self.today - timedelta(days=self.today.weekday())
+        elif period == 'month':
+            start = self.today.replace(day=1)
+        else:
+            start = None
+        return self.get_period_statistics(start, self.today if start else None, strategy)
     
     def update_trade(self, trade_id, updates, date=None):
-        """Update an existing trade (e.g., close it with exit price)"""
-        if date is None:
-            date = self.today
-        
-        log_path = self.logs_dir / self.get_log_filename(date)
-        
-        if not log_path.exists():
-            logger.warning(f"No trades found for {date}")
-            return False
+        """
+        Update an existing trade (e.g., close it with exit price).
+        Without a date the trade is found by order_id across the full history.
+        """
+        self._check_day()
+        if self.store is not None:
+            result = self.store.update_trade(trade_id, updates, date)
+            if result is None:
+                logger.warning(f"Trade {trade_id} not found in {date or 'any'} logs")
+                return False
+            trade_date, before, after = result
+            self.rollups.apply(trade_date, before, after)
+            logger.info(f"Updated trade {trade_id}")
+            return True
         
         try:
-            with open(log_path, 'r') as f:
-                data = json.load(f)
-            
-            # Find and update trade by order_id or index
-            for trade in data.get('trades', []):
-                if trade.get('order_id') == trade_id or trade.get('id') == trade_id:
-                    trade.update(updates)
-                    
-                    with open(log_path, 'w') as f:
-                        json.dump(data, f, indent=2)
-                    
-                    logger.info(f"Updated trade {trade_id}")
-                    return True
+            with self.journal.file_lock:
+                entry = self.order_index.get(trade_id)
+                if entry is not None and (date is None or str(date) == entry['date']):
+                    date, strategy = entry['date'], entry['strategy']
+                    trade = self.get_trade(trade_id)
+                else:
+                    # Not indexed (legacy JSON log): scan the given day
+                    if date is None:
+                        date = self.today
+                    trade = next((t for t in self._read_log(self.logs_dir / self.get_log_filename(date))
+                                  if t.get('order_id') == trade_id or t.get('id') == trade_id), None)
+                    if trade is None:
+                        logger.warning(f"Trade {trade_id} not found in {date} logs")
+                        return False
+                    strategy = trade.get('strategy')
+                
+                log_path = self.logs_dir / self.get_log_filename(date)
+                self._ensure_journal(log_path)
+                offset = self.journal.update(log_path, trade_id, updates)
+                self.order_index.add(trade_id, date, strategy, offset)
+                if strategy:
+                    strategy_path = self.strategy_logs_dir / self.get_strategy_log_filename(strategy, date)
+                    self._ensure_journal(strategy_path)
+                    self.journal.update(strategy_path, trade_id, updates)
+                self.rollups.apply(date, trade, dict(trade, **updates))
             
-            logger.warning(f"Trade {trade_id} not found in {date} logs")
-            return False
+            logger.info(f"Updated trade {trade_id}")
+            return True
         
         except Exception as e:
             logger.error(f"Error updating trade: {e}")
             return False
     
+    def compact(self, date=None):
+        """Fold update records into their trades for a day's daily and strategy journals"""
+        if self.store is not None:
+            return
+        if date is None:
+            date = self.today
+        if isinstance(date, str):
+            date = datetime.strptime(date, '%Y-%m-%d').date()
+        
+        with self.journal.file_lock:
+            compacted = self.journal.compact(self.logs_dir / self.get_log_filename(date))
+            if compacted:
+                self.order_index.replace_date(date, compacted)
+            for path in self.strategy_logs_dir.glob(f"*_{date.strftime('%Y-%m-%d')}_trades.jsonl"):
+                self.journal.compact(path)
+    
+    def compact_previous_days(self):
+        """
+        Compact every earlier day's journals that changed since they were last compacted
+        (run at startup and on day rollover). The journal mtime after each compaction is
+        kept in compaction.json, so unchanged days cost one stat.
+        """
+        state_path = self.logs_dir / "compaction.json"
+        with self.journal.file_lock:
+            try:
+                with open(state_path, 'r') as f:
+                    state = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                state = {}
+            compacted = 0
+            for log_path in sorted(self.logs_dir.glob('*_trades.jsonl')):
+                date = log_path.name.split('_trades')[0]
+                if date >= str(self.today) or state.get(date) == log_path.stat().st_mtime_ns:
+                    continue
+                self.compact(date)
+                state[date] = log_path.stat().st_mtime_ns
+                compacted += 1
+            if compacted:
+                tmp = state_path.with_suffix(".tmp")
+                with open(tmp, 'w') as f:
+                    json.dump(state, f)
+                tmp.replace(state_path)
+                logger.info(f"Compacted {compacted} earlier days' trade journals")
+    
     def export_csv(self, start_date, end_date=None, filename=None):
         """Export trades to CSV for analysis"""
         if filename is None:
             filename = f"trades_{start_date}_to_{end_date or self.today}.csv"
-        
-        import csv
-        csv_path = self.logs_dir / filename
-        
-        trades_data = self.get_date_range_trades(start_date, end_date)
-        trades = trades_data.get('trades', [])
-        
-        if not trades:
-            logger.warning("No trades to export")
-            return None
-        
-        try:
-            with open(csv_path, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=trades[0].keys())
-                writer.writeheader()
-                writer.writerows(trades)
-            
-            logger.info(f"Exported {len(trades)} trades to {csv_path}")
-            return csv_path
-        
-        except Exception as e:
-            logger.error(f"Error exporting CSV: {e}")
-            return None
+        return self.export_trades(start_date, end_date, self.logs_dir / filename, fmt='csv')
     
     def export_daily_trades_to_csv(self, date_str):
         """Export trades from a specific day to CSV file"""
-        import csv
+        if not isinstance(date_str, str):
+            date_str = date_str.strftime('%Y-%m-%d')
+        csv_path = self.export_trades(date_str, date_str, self.logs_dir / f"trades_{date_str}.csv", fmt='csv')
+        return str(csv_path) if csv_path else None
+    
+    def get_export_schema(self, start_date=None, end_date=None, **filters):
+        """
+        First export pass: union of every field in the range (first-seen order) and its type,
+        'number', 'bool' or 'string', so every chunk is written with the same columns.
+        """
+        kinds = {}
+        for trade in self.iter_trades(start_date, end_date, **filters):
+            for key, value in trade.items():
+                if value is None:
+                    kinds.setdefault(key, None)
+                    continue
+                kind = 'bool' if isinstance(value, bool) else 'number' if isinstance(value, (int, float)) else 'string'
+                if kinds.get(key) in (None, kind):
+                    kinds[key] = kind
+                else:
+                    kinds[key] = 'string'
+        return {key: kind or 'string' for key, kind in kinds.items()}
+    
+    def export_trades(self, start_date=None, end_date=None, path=None, fmt='csv', chunk_size=EXPORT_CHUNK_SIZE, **filters):
+        """
+        Stream trades to CSV or Parquet in two passes (schema, then rows) holding at most
+        chunk_size rows in memory. filters are passed to iter_trades. Returns the path (None if no trades).
+        """
+        if path is None:
+            path = self.logs_dir / f"trades_{start_date or 'all'}_to_{end_date or self.today}.{fmt}"
+        path = Path(path)
         
         try:
-            # Parse date string if needed
-            if isinstance(date_str, str):
-                date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
-            else:
-                date_obj = date_str
-            
-            # Get trades for that specific day
-            trades = self.get_daily_trades(date_obj)
-            
-            if not trades:
-                logger.warning(f"No trades found for {date_obj}")
+            schema = self.get_export_schema(start_date, end_date, **filters)
+            if not schema:
+                logger.warning("No trades to export")
                 return None
             
-            # Create CSV filename
-            csv_filename = f"trades_{date_obj.strftime('%Y-%m-%d')}.csv"
-            csv_path = self.logs_dir / csv_filename
-            
-            # Write to CSV
-            with open(csv_path, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=trades[0].keys())
-                writer.writeheader()
-                writer.writerows(trades)
+            count = 0
+            chunk = []
+            if fmt == 'parquet':
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                types = {'number': pa.float64(), 'bool': pa.bool_(), 'string': pa.string()}
+                arrow_schema = pa.schema([(key, types[kind]) for key, kind in schema.items()])
+                with pq.ParquetWriter(path, arrow_schema) as writer:
+                    for trade in self.iter_trades(start_date, end_date, **filters):
+                        chunk.append(self._export_row(trade, schema))
+                        if len(chunk) >= chunk_size:
+                            writer.write_table(pa.Table.from_pylist(chunk, schema=arrow_schema))
+                            count += len(chunk)
+                            chunk = []
+                    if chunk:
+                        writer.write_table(pa.Table.from_pylist(chunk, schema=arrow_schema))
+                        count += len(chunk)
+            else:
+                import csv
+                with open(path, 'w', newline='') as f:
+                    writer = csv.DictWriter(f, fieldnames=list(schema), restval='')
+                    writer.writeheader()
+                    for trade in self.iter_trades(start_date, end_date, **filters):
+                        chunk.append(self._export_row(trade, schema))
+                        if len(chunk) >= chunk_size:
+                            writer.writerows(chunk)
+                            count += len(chunk)
+                            chunk = []
+                    writer.writerows(chunk)
+                    count += len(chunk)
             
-            logger.info(f"Exported {len(trades)} trades for {date_obj} to {csv_path}")
-            return str(csv_path)
+            logger.info(f"Exported {count} trades to {path}")
+            return path
         
         except Exception as e:
-            logger.error(f"Error exporting daily trades: {e}")
+            logger.error(f"Error exporting trades: {e}")
             return None
+    
+    def _export_row(self, trade, schema):
+        row = {}
+        for key, kind in schema.items():
+            value = trade.get(key)
+            if value is None:
+                row[key] = None
+            elif kind == 'number':
+                row[key] = float(value)
+            elif kind == 'string' and not isinstance(value, str):
+                row[key] = json.dumps(value, default=str) if isinstance(value, (dict, list)) else str(value)
+            else:
+                row[key] = value
+        return row
 
 
 # Global instance
@@ -0,0 +1,172 @@
+# trade_rollups.py
+# Incrementally maintained per-day statistics for TradeLogger.
+# One small JSON file per trading day (overall + per strategy) is updated whenever a
+# trade is logged or changed, so daily/weekly/monthly/all-time summaries never
+# re-read raw trades.
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import *
+from file_lock import file_lock
+import json
+import os
+import threading
+
+
+def empty_stats():
+    return {
+        'total_trades': 0,
+        'closed_trades': 0,
+        'open_trades': 0,
+        'winning_trades': 0,
+        'losing_trades': 0,
+        'total_pnl': 0.0,
+        'best_trade': None,
+        'worst_trade': None,
+    }
+
+
+def _trade_key(trade):
+    return trade.get('order_id') or trade.get('id')
+
+
+class TradeRollups:
+    """
+    Rollup records under ROLLUPS_DIR/<YYYY-MM-DD>.json:
+    {'all': stats, 'by_strategy': {strategy: stats}}.
+    A day without a rollup file is rebuilt once from its raw trades via read_day(date).
+    Cached days are re-read when their file changed on disk (another writer), and every
+    read-modify-write holds file_lock(lock_path), the lock the trade journals write under.
+    """
+
+    def __init__(self, read_day, root=ROLLUPS_DIR, lock_path=TRADE_LOCK_PATH):
+        self.root = Path(root)
+        self.read_day = read_day
+        self.days = {}
+        self.signatures = {}
+        self.lock = threading.RLock()
+        self.file_lock = file_lock(lock_path)
+
+    def get_path(self, date):
+        return self.root / f"{date}.json"
+
+    def get(self, date):
+        """Rollup for one YYYY-MM-DD date"""
+        with self.file_lock, self.lock:
+            return self._load(str(date))[0]
+
+    def _signature(self, path):
+        try:
+            st = path.stat()
+            return st.st_ino, st.st_mtime_ns, st.st_size
+        except FileNotFoundError:
+            return None
+
+    def _load(self, date):
+        """(rollup, rebuilt) - rebuilt is True when the rollup was just recomputed from raw trades"""
+        path = self.get_path(date)
+        signature = self._signature(path)
+        if date in self.days and signature is not None and self.signatures.get(date) == signature:
+            return self.days[date], False
+        if signature is not None:
+            try:
+                with open(path, 'r') as f:
+                    self.days[date] = json.load(f)
+                self.signatures[date] = signature
+                return self.days[date], False
+            except Exception as e:
+                logger.warning(f"Rebuilding unreadable rollup {path.name}: {e}")
+        return self.rebuild(date), True
+
+    def rebuild(self, date):
+        """Recompute one day's rollup from its raw trades"""
+        date = str(date)
+        with self.file_lock, self.lock:
+            rollup = {'all': empty_stats(), 'by_strategy': {}}
+            for trade in self.read_day(date):
+                self._add(rollup, trade)
+            self.days[date] = rollup
+            self._save(date)
+        return rollup
+
+    def apply(self, date, old, new):
+        """Replace trade `old` (None for a new trade) with `new` in the day's rollup"""
+        date = str(date)
+        with self.file_lock, self.lock:
+            rollup, rebuilt = self._load(date)
+            if rebuilt:
+                return   # the raw trades already include this change
+            if old is not None and not self._remove(rollup, old):
+                self.rebuild(date)
+                return
+            self._add(rollup, new)
+            self._save(date)
+
+    def _targets(self, rollup, trade):
+        strategy = trade.get('strategy') or 'unknown'
+        return [rollup['all'], rollup['by_strategy'].setdefault(strategy, empty_stats())]
+
+    def _add(self, rollup, trade):
+        for stats in self._targets(rollup, trade):
+            stats['total_trades'] += 1
+            if trade.get('status') == 'OPEN':
+                stats['open_trades'] += 1
+            elif trade.get('status') == 'CLOSED':
+                pnl = trade.get('pnl_amount', 0)
+                stats['closed_trades'] += 1
+                stats['total_pnl'] += pnl
+                if pnl > 0:
+                    stats['winning_trades'] += 1
+                elif pnl < 0:
+                    stats['losing_trades'] += 1
+                if stats['best_trade'] is None or pnl > stats['best_trade'].get('pnl_amount', 0):
+                    stats['best_trade'] = trade
+                if stats['worst_trade'] is None or pnl < stats['worst_trade'].get('pnl_amount', 0):
+                    stats['worst_trade'] = trade
+
+    def _remove(self, rollup, trade):
+        """Undo _add for trade; False when best/worst would need a rescan (caller rebuilds)"""
+        for stats in self._targets(rollup, trade):
+            stats['total_trades'] -= 1
+            if trade.get('status') == 'OPEN':
+                stats['open_trades'] -= 1
+            elif trade.get('status') == 'CLOSED':
+                for extreme in ('best_trade', 'worst_trade'):
+                    if stats[extreme] is not None and _trade_key(stats[extreme]) == _trade_key(trade):
+                        return False
+                pnl = trade.get('pnl_amount', 0)
+                stats['closed_trades'] -= 1
+                stats['total_pnl'] -= pnl
+                if pnl > 0:
+                    stats['winning_trades'] -= 1
+                elif pnl < 0:
+                    stats['losing_trades'] -= 1
+        return True
+
+    def _save(self, date):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.get_path(date)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, 'w') as f:
+            json.dump(self.days[date], f, default=str)
+        os.replace(tmp, path)
+        self.signatures[date] = self._signature(path)
+
+    def summarize(self, dates, strategy=None):
+        """Merge the rollups of several days (optionally one strategy) into one stats record"""
+        total = empty_stats()
+        for date in dates:
+            rollup = self.get(date)
+            stats = rollup['all'] if strategy is None else rollup['by_strategy'].get(strategy)
+            if not stats:
+                continue
+            for key in ('total_trades', 'closed_trades', 'open_trades', 'winning_trades', 'losing_trades', 'total_pnl'):
+                total[key] += stats[key]
+            best, worst = stats['best_trade'], stats['worst_trade']
+            if best is not None and (total['best_trade'] is None or best.get('pnl_amount', 0) > total['best_trade'].get('pnl_amount', 0)):
+                total['best_trade'] = best
+            if worst is not None and (total['worst_trade'] is None or worst.get('pnl_amount', 0) < total['worst_trade'].get('pnl_amount', 0)):
+                total['worst_trade'] = worst
+        return total
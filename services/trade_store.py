@@ -0,0 +1,167 @@
+# trade_store.py
+# SQLite storage backend for TradeLogger (TRADE_STORE_BACKEND = "sqlite").
+# One row per trade, full trade dict kept as JSON plus indexed columns for the
+# fields the GUI filters on, so range queries and updates are indexed SQL.
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import *
+import json
+import sqlite3
+import threading
+
+INDEXED_FIELDS = ('symbol', 'strategy', 'status', 'order_id')
+
+
+class SQLiteTradeStore:
+    """
+    Trades table in WAL mode (readers never block the writer), indexed on
+    date, symbol, strategy, status and order_id.
+    """
+
+    def __init__(self, path=TRADE_DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS trades (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    date TEXT NOT NULL,
+                    symbol TEXT,
+                    strategy TEXT,
+                    status TEXT,
+                    order_id TEXT,
+                    data TEXT NOT NULL
+                )""")
+            for column in ('date',) + INDEXED_FIELDS:
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_trades_{column} ON trades({column})")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def add_trade(self, date, trade):
+        """Insert one trade for a YYYY-MM-DD date"""
+        with self.lock, self.conn:
+            self._insert(date, trade)
+
+    def update_trade(self, trade_id, updates, date=None):
+        """
+        Merge updates into the trade with this order_id (newest match, optionally within one date).
+        Returns (date, trade_before, trade_after), or None when no trade matches.
+        """
+        sql = "SELECT id, date, data FROM trades WHERE order_id = ?"
+        params = [str(trade_id)]
+        if date is not None:
+            sql += " AND date = ?"
+            params.append(str(date))
+        with self.lock, self.conn:
+            row = self.conn.execute(sql + " ORDER BY id DESC LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+            before = json.loads(row['data'])
+            trade = dict(before, **updates)
+            self.conn.execute(
+                "UPDATE trades SET symbol = ?, strategy = ?, status = ?, order_id = ?, data = ? WHERE id = ?",
+                tuple(self._column(trade, f) for f in INDEXED_FIELDS) + (json.dumps(trade, default=str), row['id']))
+            return row['date'], before, trade
+
+    def get_trade(self, trade_id):
+        """Newest trade with this order_id (index lookup), or None"""
+        with self.lock:
+            row = self.conn.execute("SELECT data FROM trades WHERE order_id = ? ORDER BY id DESC LIMIT 1", (str(trade_id),)).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def query_trades(self, start_date=None, end_date=None, symbol=None, strategy=None, status=None,
+                     limit=None, offset=0, newest_first=False):
+        """Trades matching every given filter, in insertion order (or newest first)"""
+        where, params = self._where(start_date, end_date, symbol, strategy, status)
+        sql = f"SELECT data FROM trades{where} ORDER BY id {'DESC' if newest_first else 'ASC'}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [json.loads(row['data']) for row in rows]
+
+    def iter_trades(self, start_date=None, end_date=None, symbol=None, strategy=None, status=None,
+                    batch_size=1000, newest_first=False):
+        """Stream matching trades in insertion order (or newest first) through a separate read connection (WAL: writers aren't blocked)"""
+        where, params = self._where(start_date, end_date, symbol, strategy, status)
+        conn = sqlite3.connect(str(self.path))
+        try:
+            cursor = conn.execute(f"SELECT data FROM trades{where} ORDER BY id {'DESC' if newest_first else 'ASC'}", params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for (data,) in rows:
+                    yield json.loads(data)
+        finally:
+            conn.close()
+
+    def count_trades(self, start_date=None, end_date=None, symbol=None, strategy=None, status=None):
+        where, params = self._where(start_date, end_date, symbol, strategy, status)
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM trades{where}", params).fetchone()[0]
+
+    def available_dates(self):
+        """Dates with at least one trade, most recent first"""
+        with self.lock:
+            return [row[0] for row in self.conn.execute("SELECT DISTINCT date FROM trades ORDER BY date DESC")]
+
+    def _where(self, start_date, end_date, symbol, strategy, status):
+        clauses, params = [], []
+        if start_date is not None:
+            clauses.append("date >= ?")
+            params.append(str(start_date))
+        if end_date is not None:
+            clauses.append("date <= ?")
+            params.append(str(end_date))
+        for column, value in (('symbol', symbol), ('strategy', strategy), ('status', status)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _insert(self, date, trade):
+        self.conn.execute(
+            "INSERT INTO trades (date, symbol, strategy, status, order_id, data) VALUES (?, ?, ?, ?, ?, ?)",
+            (str(date),) + tuple(self._column(trade, f) for f in INDEXED_FIELDS) + (json.dumps(trade, default=str),))
+
+    def _column(self, trade, field):
+        value = trade.get(field)
+        return None if value is None else str(value)
+
+    def migrate_from_logs(self, logs_dir, read_log):
+        """
+        One-time import of the daily trade logs (legacy JSON or journals) in logs_dir.
+        read_log(date) returns a day's trades; strategy logs are not imported since
+        every trade is also in its daily log. Returns the number of trades imported.
+        """
+        with self.lock:
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_logs'").fetchone():
+                return 0
+            dates = sorted({p.name.split('_trades')[0] for p in Path(logs_dir).glob('*_trades.json*')
+                            if p.suffix in ('.json', '.jsonl')})
+            imported = 0
+            with self.conn:
+                for date in dates:
+                    for trade in read_log(date):
+                        self._insert(date, trade)
+                        imported += 1
+                self.conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_logs', ?)", (str(imported),))
+        if imported:
+            logger.info(f"Migrated {imported} trades from {len(dates)} daily logs into {self.path.name}")
+        return imported
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -8,15 +8,19 @@ from pathlib import Path
 from datetime import datetime, timedelta
 import threading
 import time
+from itertools import islice
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QTabWidget, QTableWidget, QTableWidgetItem, QPushButton, QLabel,
     QLineEdit, QComboBox, QSpinBox, QDoubleSpinBox, QCheckBox,
     QStatusBar, QMessageBox, QProgressBar, QGroupBox, QGridLayout,
-    QFrame, QCalendarWidget, QListWidget, QListWidgetItem
+    QFrame, QCalendarWidget, QListWidget, QListWidgetItem, QTableView
+)
+from PyQt5.QtCore import (
+    Qt, QTimer, pyqtSignal, QObject, QThread, QDate, QDateTime,
+    QAbstractTableModel, QModelIndex
 )
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QObject, QThread, QDate, QDateTime
 from PyQt5.QtGui import QFont, QColor, QIcon, QPixmap
 
 # Add services directory to path
@@ -27,7 +31,7 @@ from live_trader import LiveTrader
 from ml_predictor import MLPredictor
 from market_scheduler import MarketScheduler
 from strategy_manager import StrategyManager
-from trade_logger import TradeLogger
+from trade_logger import trade_logger
 
 
 class TradingWorker(QThread):
@@ -83,6 +87,161 @@ class TradingWorker(QThread):
                 self.trader.stop()
 
 
+def _short_time(value):
+    if value and value != "-" and len(value) > 8:
+        return value[-8:]
+    return value or "-"
+
+
+def _pnl_color(trade):
+    pnl = trade.get('pnl_amount', 0) or 0
+    if pnl > 0:
+        return QColor(200, 255, 200)
+    if pnl < 0:
+        return QColor(255, 200, 200)
+    return None
+
+
+# (header, value, colored by P&L)
+TRADES_COLUMNS = [
+    ("Date", lambda t: str(t.get('date') or t.get('timestamp', '--')[:10]), False),
+    ("Symbol", lambda t: t.get('symbol', '--'), False),
+    ("Strategy", lambda t: t.get('strategy', '--'), False),
+    ("Side", lambda t: t.get('side', '--'), False),
+    ("Qty", lambda t: str(t.get('qty', 0)), False),
+    ("Entry Price", lambda t: f"${t.get('entry_price', 0):.2f}", False),
+    ("Entry Time", lambda t: _short_time(t.get('entry_time')), False),
+    ("Exit Price", lambda t: f"${t['exit_price']:.2f}" if t.get('exit_price') else "-", False),
+    ("Exit Time", lambda t: _short_time(t.get('exit_time')), False),
+    ("P&L %", lambda t: f"{(t.get('pnl_pct') or 0) * 100:+.2f}%", False),
+    ("P&L $", lambda t: f"${t.get('pnl_amount', 0) or 0:+,.2f}", False),
+]
+
+HISTORY_COLUMNS = [
+    ("Time", lambda t: _short_time(t.get('entry_time')), False),
+    ("Symbol", lambda t: t.get('symbol', '--'), False),
+    ("Strategy", lambda t: t.get('strategy', '--'), False),
+    ("Side", lambda t: t.get('side', '--'), False),
+    ("Qty", lambda t: str(t.get('qty', 0)), False),
+    ("Entry", lambda t: f"${t.get('entry_price', 0):.2f}", False),
+    ("Exit", lambda t: f"${t['exit_price']:.2f}" if t.get('exit_price') else "-", False),
+    ("Status", lambda t: t.get('status', '--'), False),
+    ("P&L", lambda t: f"${t.get('pnl_amount', 0) or 0:+,.2f}", True),
+]
+
+
+class TradeTableModel(QAbstractTableModel):
+    """
+    Lazily paged, newest-first view over TradeLogger.iter_trades.
+    Filters are passed down to the trade store; rows are pulled BATCH_SIZE at a
+    time as the view scrolls (canFetchMore/fetchMore), and refresh() only reads
+    trades newer than the head and repaints open rows whose data changed.
+    """
+    
+    BATCH_SIZE = 200
+    
+    def __init__(self, trade_logger, columns, parent=None):
+        super().__init__(parent)
+        self.trade_logger = trade_logger
+        self.columns = columns
+        self.filters = None
+        self.rows = []
+        self.source = iter(())
+        self.exhausted = True
+    
+    def set_filters(self, **filters):
+        """Apply new store filters and restart from the newest trade"""
+        self.beginResetModel()
+        self.filters = filters
+        self._open()
+        self.rows = self._take(self.BATCH_SIZE)
+        self.endResetModel()
+    
+    def refresh(self):
+        """Insert trades newer than the current head and repaint open rows that have been updated"""
+        if self.filters is None:
+            return
+        if not self.rows:
+            self.set_filters(**self.filters)
+            return
+        
+        # Newest first, so everything before the first loaded trade is new
+        loaded = {self._key(t) for t in self.rows}
+        added = []
+        for trade in self.trade_logger.iter_trades(newest_first=True, **self.filters):
+            if self._key(trade) in loaded:
+                break
+            added.append(trade)
+        if added:
+            self.beginInsertRows(QModelIndex(), 0, len(added) - 1)
+            self.rows[0:0] = added
+            self.endInsertRows()
+        
+        # Only open trades still receive updates (exit price, P&L, status)
+        for i in range(len(added), len(self.rows)):
+            trade = self.rows[i]
+            if trade.get('status') == 'CLOSED' or not trade.get('order_id'):
+                continue
+            current = self.trade_logger.get_trade(trade['order_id'])
+            if current is not None and current != trade:
+                self.rows[i] = current
+                self.dataChanged.emit(self.index(i, 0), self.index(i, len(self.columns) - 1))
+    
+    def latest(self, count):
+        return self.rows[:count]
+    
+    def _open(self):
+        self.source = self.trade_logger.iter_trades(newest_first=True, **self.filters)
+        self.exhausted = False
+    
+    def _take(self, count):
+        batch = list(islice(self.source, count))
+        if len(batch) < count:
+            self.exhausted = True
+        return batch
+    
+    def _key(self, trade):
+        return trade.get('order_id') or trade.get('id') or (trade.get('timestamp'), trade.get('symbol'))
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        trade = self.rows[index.row()]
+        header, value, colored = self.columns[index.column()]
+        if role == Qt.DisplayRole:
+            try:
+                return value(trade)
+            except Exception:
+                return "--"
+        if role == Qt.BackgroundRole and colored:
+            return _pnl_color(trade)
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section][0]
+        return None
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        batch = self._take(self.BATCH_SIZE)
+        if not batch:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(batch) - 1)
+        self.rows.extend(batch)
+        self.endInsertRows()
+
+
 class TradingGUI(QMainWindow):
     """Main trading application GUI with multi-strategy support"""
     
@@ -97,7 +256,7 @@ class TradingGUI(QMainWindow):
         self.trading_worker = None
         self.trader = None
         self.strategy_manager = StrategyManager()
-        self.trade_logger = TradeLogger()
+        self.trade_logger = trade_logger   # process-wide instance, shared with live trading
         self.current_strategy = 'macd_crossover'
         
         # Initialize predictors for each strategy
@@ -357,13 +516,10 @@ class TradingGUI(QMainWindow):
         
         layout.addLayout(filter_layout)
         
-        # Trades table
-        self.trades_table = QTableWidget()
-        self.trades_table.setColumnCount(11)
-        self.trades_table.setHorizontalHeaderLabels([
-            "Date", "Symbol", "Strategy", "Side", "Qty", "Entry Price", "Entry Time",
-            "Exit Price", "Exit Time", "P&L %", "P&L $"
-        ])
+        # Trades table (rows are paged in from the trade store as the view scrolls)
+        self.trades_model = TradeTableModel(self.trade_logger, TRADES_COLUMNS)
+        self.trades_table = QTableView()
+        self.trades_table.setModel(self.trades_model)
         self.trades_table.setAlternatingRowColors(True)
         self.trades_table.horizontalHeader().setStretchLastSection(True)
         
@@ -459,11 +615,9 @@ class TradingGUI(QMainWindow):
         
         # Trades table for the day
         right_layout.addWidget(QLabel("Trades for Selected Date:"))
-        self.history_trades_table = QTableWidget()
-        self.history_trades_table.setColumnCount(9)
-        self.history_trades_table.setHorizontalHeaderLabels([
-            "Time", "Symbol", "Strategy", "Side", "Qty", "Entry", "Exit", "Status", "P&L"
-        ])
+        self.history_model = TradeTableModel(self.trade_logger, HISTORY_COLUMNS)
+        self.history_trades_table = QTableView()
+        self.history_trades_table.setModel(self.history_model)
         self.history_trades_table.setAlternatingRowColors(True)
         self.history_trades_table.horizontalHeader().setStretchLastSection(True)
         right_layout.addWidget(self.history_trades_table)
@@ -510,19 +664,12 @@ class TradingGUI(QMainWindow):
         # Get strategy filter
         strategy_filter = self.history_strategy_filter.currentData()
         
-        # Load trades for the day
-        if strategy_filter:
-            daily_data = self.trade_logger.get_strategy_daily_trades(strategy_filter, date_str)
-        else:
-            daily_data = self.trade_logger.get_daily_trades(date_str)
-        
-        # Extract the trades list from the returned dict
-        trades = daily_data.get('trades', [])
+        # Trades for the day are paged in by the model
+        self.history_model.set_filters(start_date=date_str, end_date=date_str, strategy=strategy_filter or None)
         
         # Update statistics
-        if trades:
-            stats = self.trade_logger.get_daily_statistics(date_str)
-            
+        stats = self.trade_logger.get_daily_statistics(date_str)
+        if stats.get('total_trades', 0):
             if strategy_filter and strategy_filter in stats.get('by_strategy', {}):
                 stats = stats['by_strategy'][strategy_filter]
             
@@ -533,42 +680,6 @@ class TradingGUI(QMainWindow):
             self.history_stats['win_rate'].setText(f"{win_rate:.1%}")
             self.history_stats['total_pnl'].setText(f"${stats.get('total_pnl', 0):,.2f}")
             self.history_stats['avg_pnl'].setText(f"${stats.get('avg_pnl', 0):,.2f}")
-        
-        # Update trades table
-        self.history_trades_table.setRowCount(0)
-        for trade in reversed(trades):
-            row = self.history_trades_table.rowCount()
-            self.history_trades_table.insertRow(row)
-            
-            entry_time = trade.get('entry_time', "-")
-            if entry_time != "-" and len(entry_time) > 8:
-                entry_time = entry_time[-8:]
-            self.history_trades_table.setItem(row, 0, QTableWidgetItem(entry_time))
-            
-            self.history_trades_table.setItem(row, 1, QTableWidgetItem(trade['symbol']))
-            self.history_trades_table.setItem(row, 2, QTableWidgetItem(trade.get('strategy', '--')))
-            self.history_trades_table.setItem(row, 3, QTableWidgetItem(trade['side']))
-            self.history_trades_table.setItem(row, 4, QTableWidgetItem(str(trade['qty'])))
-            self.history_trades_table.setItem(row, 5, QTableWidgetItem(f"${trade['entry_price']:.2f}"))
-            
-            exit_price = trade.get('exit_price')
-            self.history_trades_table.setItem(
-                row, 6,
-                QTableWidgetItem(f"${exit_price:.2f}" if exit_price else "-")
-            )
-            
-            self.history_trades_table.setItem(row, 7, QTableWidgetItem(trade['status']))
-            
-            pnl = trade.get('pnl_amount', 0)
-            pnl_item = QTableWidgetItem(f"${pnl:+,.2f}")
-            
-            # Color code P&L
-            if pnl > 0:
-                pnl_item.setBackground(QColor(200, 255, 200))
-            elif pnl < 0:
-                pnl_item.setBackground(QColor(255, 200, 200))
-            
-            self.history_trades_table.setItem(row, 8, pnl_item)
     
     def export_day(self):
         """Export selected day's trades to CSV"""
@@ -891,37 +1002,26 @@ class TradingGUI(QMainWindow):
     def refresh_trades(self):
         """Refresh trades table"""
         try:
-            # Get all trades
-            all_dates = self.trade_logger.get_available_dates()
-            all_trades = []
-            
-            if all_dates:  # Only try to fetch trades if dates exist
-                for date in all_dates:
-                    try:
-                        trades = self.trade_logger.get_daily_trades(date)
-                        if trades:
-                            all_trades.extend(trades)
-                    except:
-                        pass  # Skip this date if error occurs
-            
-            # Filter trades
+            # Filters are applied by the trade store (indexed SQL with the sqlite backend)
             symbol_filter = self.symbol_filter.text().upper()
             status_filter = self.status_filter.currentText()
             strategy_filter = self.trades_strategy_filter.currentData()
             
-            filtered_trades = []
-            for trade in all_trades:
-                if symbol_filter and trade.get('symbol') != symbol_filter:
-                    continue
-                if status_filter != "All" and trade.get('status') != status_filter:
-                    continue
-                if strategy_filter and strategy_filter != "All" and trade.get('strategy') != strategy_filter:
-                    continue
-                filtered_trades.append(trade)
+            filters = {
+                'symbol': symbol_filter or None,
+                'status': None if status_filter == "All" else status_filter,
+                'strategy': None if not strategy_filter or strategy_filter == "All" else strategy_filter,
+            }
+            
+            # Full trades table: reload on a filter change, otherwise apply only the differences
+            if filters != self.trades_model.filters:
+                self.trades_model.set_filters(**filters)
+            else:
+                self.trades_model.refresh()
             
-            # Update recent trades table (last 10)
+            # Update recent trades table (last 10, oldest first)
             self.recent_trades_table.setRowCount(0)
-            for trade in filtered_trades[-10:]:
+            for trade in reversed(self.trades_model.latest(10)):
                 try:
                     row = self.recent_trades_table.rowCount()
                     self.recent_trades_table.insertRow(row)
@@ -950,41 +1050,6 @@ class TradingGUI(QMainWindow):
                             self.recent_trades_table.item(row, i).setBackground(QColor(255, 200, 200))
                 except:
                     pass  # Skip this trade if error occurs
-            
-            # Update full trades table
-            self.trades_table.setRowCount(0)
-            for trade in reversed(filtered_trades):
-                try:
-                    row = self.trades_table.rowCount()
-                    self.trades_table.insertRow(row)
-                    
-                    self.trades_table.setItem(row, 0, QTableWidgetItem(str(trade.get('date', '--'))))
-                    self.trades_table.setItem(row, 1, QTableWidgetItem(trade.get('symbol', '--')))
-                    self.trades_table.setItem(row, 2, QTableWidgetItem(trade.get('strategy', '--')))
-                    self.trades_table.setItem(row, 3, QTableWidgetItem(trade.get('side', '--')))
-                    self.trades_table.setItem(row, 4, QTableWidgetItem(str(trade.get('qty', 0))))
-                    self.trades_table.setItem(row, 5, QTableWidgetItem(f"${trade.get('entry_price', 0):.2f}"))
-                    
-                    entry_time = trade.get('entry_time', "-")
-                    if entry_time != "-" and len(entry_time) > 8:
-                        entry_time = entry_time[-8:]
-                    self.trades_table.setItem(row, 6, QTableWidgetItem(entry_time))
-                    
-                    exit_price = trade.get('exit_price', 0)
-                    self.trades_table.setItem(row, 7, QTableWidgetItem(f"${exit_price:.2f}" if exit_price else "-"))
-                    
-                    exit_time = trade.get('exit_time', "-")
-                    if exit_time != "-" and len(exit_time) > 8:
-                        exit_time = exit_time[-8:]
-                    self.trades_table.setItem(row, 8, QTableWidgetItem(exit_time))
-                    
-                    pnl_pct = trade.get('pnl_pct', 0) * 100 if trade.get('pnl_pct') else 0
-                    self.trades_table.setItem(row, 9, QTableWidgetItem(f"{pnl_pct:+.2f}%"))
-                    
-                    pnl_amount = trade.get('pnl_amount', 0)
-                    self.trades_table.setItem(row, 10, QTableWidgetItem(f"${pnl_amount:+,.2f}"))
-                except:
-                    pass  # Skip this trade if error occurs
         
         except Exception as e:
             logger.error(f"Error refreshing trades: {e}")
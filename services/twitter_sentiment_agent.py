@@ -83,6 +83,17 @@ class TwitterSentimentAgent:
 
         return "HOLD", confidence, f"Neutral ({catalyst_score:.2f} catalyst score)"
 
+    def predict(self, symbols=None):
+        """Ensemble-style vote for the first symbol (same shape as the other agents' predict)"""
+        ticker = symbols[0] if symbols else self.watchlist[0]
+        vote, conf, reason = self.get_vote(ticker)
+        return {
+            "specialist": "twitter_sentiment",
+            "signal": 1 if vote == "BUY" else 0,
+            "confidence": conf / 100.0,
+            "rationale": reason
+        }
+
 # Test it live
 if __name__ == "__main__":
     agent = TwitterSentimentAgent()
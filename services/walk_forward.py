@@ -0,0 +1,168 @@
+# services/walk_forward.py - WALK-FORWARD BACKTEST
+# Slides train/test windows over the cached bar history, retrains every ML
+# specialist per fold (in parallel) and tests it out-of-sample on the next days.
+# Fold models are cached under WALK_FORWARD_DIR by a hash of their training data,
+# so re-running over the same history only trains the new folds.
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import *
+from bar_store import bar_store
+from build_dataset import compute_features, compute_labels
+from ml_specialist import Specialist
+from ml_ensemble import EnsembleCoordinator
+from backtester import simulate_trades, RESULTS_DIR
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import hashlib
+import os
+
+
+def load_history(symbols, days=WALK_FORWARD_HISTORY_DAYS):
+    """Labeled feature frames for every symbol with cached bars (symbols without real bars are skipped)"""
+    start = (datetime.now(TIMEZONE) - timedelta(days=days)).date()
+    history = {}
+    for symbol, bars in bar_store.get_bars_many(symbols, start=start).items():
+        if len(bars) < 100:
+            logger.warning(f"Not enough bars for {symbol}, skipping")
+            continue
+        df = compute_labels(compute_features(bars))
+        df['Date'] = df.index.tz_convert(TIMEZONE).date
+        history[symbol] = df
+    return history
+
+
+def make_folds(days, train_days=WALK_FORWARD_TRAIN_DAYS, test_days=WALK_FORWARD_TEST_DAYS):
+    """[(train_days, test_days)] sliding forward by test_days over the sorted trading days"""
+    days = sorted(days)
+    folds = []
+    start = 0
+    while start + train_days < len(days):
+        folds.append((days[start:start + train_days], days[start + train_days:start + train_days + test_days]))
+        start += test_days
+    return folds
+
+
+def data_hash(name, df):
+    """Cache key for one specialist fold: its config plus the exact training rows"""
+    h = hashlib.sha1(repr(sorted(SPECIALISTS[name].items())).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def fit_fold(name, train_df):
+    """Train (or load from cache) one specialist on one fold; returns (model, scaler, feature_columns)"""
+    path = WALK_FORWARD_DIR / f"{name}_{data_hash(name, train_df)}.pkl"
+    if path.exists():
+        return joblib.load(path)
+    spec = Specialist(name, SPECIALISTS[name], load_model=False)
+    spec.fit(train_df, test_size=None)
+    bundle = (spec.model, spec.scaler, spec.feature_columns)
+    WALK_FORWARD_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    joblib.dump(bundle, tmp)
+    tmp.replace(path)
+    return bundle
+
+
+class WalkForwardBacktester:
+    def __init__(self, train_days=WALK_FORWARD_TRAIN_DAYS, test_days=WALK_FORWARD_TEST_DAYS, workers=None):
+        self.train_days = train_days
+        self.test_days = test_days
+        self.workers = workers or os.cpu_count() or 1
+        self.ml_names = [name for name, cfg in SPECIALISTS.items() if cfg['type'] == 'ml']
+
+    def run(self, symbols=None, days=WALK_FORWARD_HISTORY_DAYS):
+        if symbols is None:
+            symbols = ["SPY"]
+        history = load_history(symbols, days)
+        if not history:
+            logger.error("No cached history for walk-forward backtest")
+            return None
+        all_days = set()
+        for df in history.values():
+            all_days.update(df['Date'].unique())
+        folds = make_folds(all_days, self.train_days, self.test_days)
+        logger.info(f"🚶 Walk-forward: {len(history)} symbols, {len(all_days)} days, {len(folds)} folds")
+        if not folds:
+            logger.error("Not enough history for one train/test fold")
+            return None
+
+        # One task per (fold, specialist); the last LOOKAHEAD_BARS rows of each train window
+        # are purged because their labels look into the test window.
+        jobs = {}
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for k, (train_days, _) in enumerate(folds):
+                train = pd.concat([df[df['Date'].isin(train_days)].iloc[:-LOOKAHEAD_BARS] for df in history.values()])
+                for name in self.ml_names:
+                    cols = [f for f in SPECIALISTS[name]['features'] if f in train.columns] + ['Target']
+                    jobs[(k, name)] = pool.submit(fit_fold, name, train[cols])
+            models = {}
+            for (k, name), future in jobs.items():
+                try:
+                    models[(k, name)] = future.result()
+                except Exception as e:
+                    logger.error(f"Fold {k} {name} training failed, voting neutral in that fold: {e}")
+
+        fold_rows = []
+        all_trades = []
+        for k, (train_days, test_days) in enumerate(folds):
+            for symbol, df in history.items():
+                test = df[df['Date'].isin(test_days)]
+                if test.empty:
+                    continue
+                trades, _, equity, accuracy = self._test_fold(test, {name: models[(k, name)] for name in self.ml_names if (k, name) in models})
+                wins = len([t for t in trades if t.get('pnl', 0) > 0])
+                row = {
+                    'fold': k, 'symbol': symbol,
+                    'train_start': train_days[0], 'train_end': train_days[-1],
+                    'test_start': test_days[0], 'test_end': test_days[-1],
+                    'pnl': equity - 100_000, 'trades': len(trades),
+                    'win_rate': wins / len(trades) * 100 if trades else 0,
+                }
+                row.update({f"{name}_accuracy": acc for name, acc in accuracy.items()})
+                fold_rows.append(row)
+                all_trades.extend(dict(t, fold=k, symbol=symbol) for t in trades)
+
+        results = pd.DataFrame(fold_rows)
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        results.to_csv(f"{RESULTS_DIR}/walk_forward_folds.csv", index=False)
+        pd.DataFrame(all_trades).to_csv(f"{RESULTS_DIR}/walk_forward_trades.csv", index=False)
+
+        logger.info(f"\n{'='*70}")
+        logger.info(f"WALK-FORWARD COMPLETE — {len(folds)} folds | Out-of-sample P&L: ${results['pnl'].sum():,.2f}")
+        for name in self.ml_names:
+            if f'{name}_accuracy' in results:
+                logger.info(f"  {SPECIALISTS[name]['name']:22} | OOS accuracy: {results[f'{name}_accuracy'].mean():5.1f}%")
+        logger.info(f"{'='*70}")
+        return results
+
+    def _test_fold(self, test, fold_models):
+        """
+        Score the test window with the fold's specialists and replay the trade logic.
+        News/twitter are live-only agents, so they vote neutral (as with no snapshot yet).
+        """
+        n = len(test)
+        signals = np.zeros((n, len(SPECIALISTS)), dtype=int)
+        confs = np.zeros((n, len(SPECIALISTS)))
+        actual_return = test['Future_Return'].to_numpy(dtype=float)
+        actual_signal = (actual_return > PROFIT_THRESHOLD * 0.5).astype(int)
+        accuracy = {}
+        for j, name in enumerate(SPECIALISTS):
+            if name not in fold_models:
+                continue
+            spec = Specialist(name, SPECIALISTS[name], load_model=False)
+            spec.model, spec.scaler, spec.feature_columns = fold_models[name]
+            signals[:, j], confs[:, j] = spec.predict_arrays(test)
+            accuracy[name] = (signals[:, j] == actual_signal).mean() * 100
+        _, _, recommend_buy = EnsembleCoordinator.combine_arrays(signals, confs)
+        close = test['Close'].to_numpy(dtype=float)
+        trades, equity_curve, equity = simulate_trades(test.index, close, recommend_buy, actual_return, start=0, final_price=close[-1])
+        return trades, equity_curve, equity, accuracy
+
+
+if __name__ == "__main__":
+    wf = WalkForwardBacktester()
+    wf.run(symbols=sys.argv[1:] or None)